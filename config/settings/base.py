@@ -54,7 +54,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.health.HealthCheckMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -99,6 +101,71 @@ DATABASES = {
     }
 }
 
+# Embedded single-node mode: DATABASE_URL=sqlite:////var/lib/kanori/db.sqlite3
+# (three slashes for a path relative to the working directory). WAL lets
+# reads run alongside the one writer, synchronous=NORMAL is durable in WAL
+# mode except for the last commits on power loss, and IMMEDIATE transactions
+# take the write lock up front, so concurrent writers wait up to
+# SQLITE_BUSY_TIMEOUT_MS instead of failing with "database is locked"
+# halfway through.
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+SQLITE_CACHE_KIB = int(os.getenv('SQLITE_CACHE_KIB', '32768'))
+if tmpPostgres.scheme == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': tmpPostgres.path[1:],
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    f'PRAGMA mmap_size={SQLITE_MMAP_SIZE};'
+                    f'PRAGMA cache_size=-{SQLITE_CACHE_KIB};'
+                    'PRAGMA temp_store=MEMORY;'
+                ),
+            },
+        }
+    }
+
+# Optional read replica for safe API requests (core/routers.py). Users who
+# just wrote keep reading the primary for REPLICA_STICKY_SECONDS.
+DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+REPLICA_DATABASE = None
+if DATABASE_REPLICA_URL:
+    tmpReplica = urlparse(DATABASE_REPLICA_URL)
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': tmpReplica.path.replace('/', ''),
+        'USER': tmpReplica.username,
+        'PASSWORD': tmpReplica.password,
+        'HOST': tmpReplica.hostname,
+        'PORT': tmpReplica.port or 5432,
+        'OPTIONS': dict(parse_qsl(tmpReplica.query)),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASE = 'replica'
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '10'))
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+
+# Cache shared by all gunicorn workers: dashboard sections and their
+# version stamps, replica pins, throttle buckets and cached JWT auth state
+# must agree across processes. CACHE_URL=redis://host:6379/0 (needs the
+# `redis` package) is the fast option; otherwise entries live in the
+# database table CACHE_TABLE, created by `manage.py createcachetable`.
+# CACHE_URL=locmem is per process and only fit for a single worker.
+CACHE_URL = os.getenv('CACHE_URL', '')
+CACHE_TABLE = os.getenv('CACHE_TABLE', 'core_cache')
+if CACHE_URL.startswith(('redis://', 'rediss://', 'unix://')):
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}}
+elif CACHE_URL == 'locmem':
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': CACHE_TABLE}}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -119,6 +186,32 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing policy (core/hashers.py): PASSWORD_HASHER picks the
+# algorithm for new hashes (pbkdf2, scrypt or argon2). Stored hashes made with
+# another algorithm or work factor are rehashed on the next successful login.
+# The defaults match Django's own cost; measure with
+# `manage.py bench_password_hashers` before lowering them.
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', '1000000'))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv('PASSWORD_SCRYPT_WORK_FACTOR', str(2 ** 14)))
+PASSWORD_SCRYPT_PARALLELISM = int(os.getenv('PASSWORD_SCRYPT_PARALLELISM', '1'))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv('PASSWORD_ARGON2_TIME_COST', '2'))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv('PASSWORD_ARGON2_MEMORY_COST', '65536'))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv('PASSWORD_ARGON2_PARALLELISM', '1'))
+# Threads per process that run password hashing (0: hash on the request
+# thread). Bounds how many cores a login burst can take from other requests.
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '1'))
+
+_TUNED_HASHERS = {
+    'pbkdf2': 'core.hashers.TunedPBKDF2PasswordHasher',
+    'scrypt': 'core.hashers.TunedScryptPasswordHasher',
+    'argon2': 'core.hashers.TunedArgon2PasswordHasher',
+}
+PASSWORD_HASHERS = [_TUNED_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _TUNED_HASHERS.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -153,8 +246,75 @@ CORS_ALLOWED_ORIGIN_REGEXES = [
 ]
 
 
+# Authenticate JWT requests from cached user state instead of loading the
+# User row every time (core/authentication.py).
+JWT_STATELESS_AUTH = os.getenv('JWT_STATELESS_AUTH', '').lower() in ('1', 'true', 'yes')
+JWT_AUTH_CACHE_TTL = int(os.getenv('JWT_AUTH_CACHE_TTL', '60'))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.CachedJWTAuthentication"
+        if JWT_STATELESS_AUTH
+        else "rest_framework_simplejwt.authentication.JWTAuthentication",
+    ),
+    # orjson when installed, stdlib json otherwise (core/renderers.py).
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "core.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    "DEFAULT_THROTTLE_CLASSES": (
+        "core.throttling.CostThrottle",
     ),
 }
+
+# Token bucket for core.throttling.CostThrottle. A capacity of 0 disables it.
+THROTTLE_BUCKET_CAPACITY = int(os.getenv('THROTTLE_BUCKET_CAPACITY', '120'))
+THROTTLE_REFILL_PER_SECOND = float(os.getenv('THROTTLE_REFILL_PER_SECOND', '2'))
+
+# Opt-in monthly range partitioning of core_focussession (Postgres only).
+# See core/partitions.py and `manage.py focus_partitions`.
+FOCUS_SESSION_PARTITIONING = os.getenv('FOCUS_SESSION_PARTITIONING', '').lower() in ('1', 'true', 'yes')
+
+# How long deletions are remembered for /api/sync/. Clients with an older
+# token get a full snapshot. Purge with `manage.py purge_tombstones`.
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# Seconds each /api/dashboard/ section stays cached. Sections are also
+# versioned per user and dropped as soon as their data changes.
+DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', '300'))
+
+# Response compression (core/middleware.py). zstd and brotli are used when
+# the `zstandard` / `brotli` packages are installed, gzip otherwise.
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_CONTENT_TYPES = ('application/json',)
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '5'))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv('COMPRESSION_ZSTD_LEVEL', '3'))
+
+# `manage.py rebalance_positions` re-spaces task columns whose manual-order
+# keys grew longer than this (see core/ordering.py).
+TASK_POSITION_REBALANCE_LENGTH = int(os.getenv('TASK_POSITION_REBALANCE_LENGTH', '24'))
+
+# Admin changelists of tables with at least this many rows (by the planner's
+# estimate) skip the exact COUNT(*) when unfiltered. PostgreSQL only.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv('ADMIN_ESTIMATED_COUNT_THRESHOLD', '100000'))
+
+# Task and account deletions (core/deletion.py). Tasks with more sessions and
+# blocks than DELETION_INLINE_LIMIT, and all accounts, are deleted by a
+# DeletionJob: in a background thread ("thread") or only by
+# `manage.py run_deletions` ("command").
+DELETION_INLINE_LIMIT = int(os.getenv('DELETION_INLINE_LIMIT', '500'))
+DELETION_CHUNK_SIZE = int(os.getenv('DELETION_CHUNK_SIZE', '1000'))
+DELETION_BACKGROUND = os.getenv('DELETION_BACKGROUND', 'thread')
+
+# /healthz and /readyz (core/health.py). The readiness DB ping is cancelled
+# after HEALTH_DB_TIMEOUT_MS on PostgreSQL; reported p95 latency covers the
+# worker's last HEALTH_LATENCY_SAMPLES requests within HEALTH_LATENCY_WINDOW seconds.
+HEALTH_DB_TIMEOUT_MS = int(os.getenv('HEALTH_DB_TIMEOUT_MS', '500'))
+HEALTH_LATENCY_SAMPLES = int(os.getenv('HEALTH_LATENCY_SAMPLES', '2048'))
+HEALTH_LATENCY_WINDOW = int(os.getenv('HEALTH_LATENCY_WINDOW', '60'))
@@ -10,6 +10,7 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
 from dotenv import load_dotenv
 project_folder = os.path.expanduser('~/config')  # adjust as appropriate
 load_dotenv(os.path.join(project_folder, '.env'))
@@ -17,3 +18,8 @@ load_dotenv(os.path.join(project_folder, '.env'))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
 
 application = get_wsgi_application()
+
+# Import the URLconf, and with it every view and serializer, now rather than
+# on the first request; with gunicorn's preload_app this runs once in the
+# master and workers inherit the loaded modules.
+get_resolver().url_patterns
@@ -1,40 +1,136 @@
+from django.conf import settings
 from django.contrib import admin
-from .models.main import Task, FocusSession, DaySummary, Block, Setting, Note
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .models.main import (
+	Task,
+	FocusSession,
+	DaySummary,
+	Block,
+	BlockException,
+	Setting,
+	Note,
+	DeletionJob,
+	ArchivedTask,
+	ArchivedFocusSession,
+	ArchivedBlock,
+)
+
+
+class EstimatedCountPaginator(Paginator):
+	"""Uses the planner's row estimate instead of COUNT(*) for big unfiltered PostgreSQL tables."""
+
+	@cached_property
+	def count(self):
+		queryset = self.object_list
+		connection = connections[queryset.db]
+		if connection.vendor == "postgresql" and not queryset.query.where:
+			table = queryset.model._meta.db_table
+			with connection.cursor() as cursor:
+				# Partitioned parents have no estimate of their own; sum their partitions.
+				cursor.execute(
+					"SELECT COALESCE(SUM(GREATEST(reltuples, 0)), 0)::bigint FROM pg_class "
+					"WHERE oid = %s::regclass OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)",
+					[table, table],
+				)
+				estimate = cursor.fetchone()[0]
+			if estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+				return estimate
+		return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+	paginator = EstimatedCountPaginator
+	# Skip the second, unfiltered COUNT(*) behind "N total".
+	show_full_result_count = False
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
-	list_display = ("id", "title", "status", "estimated_minutes", "created_at")
+class TaskAdmin(LargeTableAdmin):
+	list_display = ("id", "title", "user", "status", "estimated_minutes", "created_at")
 	list_filter = ("status",)
+	list_select_related = ("user",)
 	search_fields = ("title", "description")
+	autocomplete_fields = ("user",)
 
 
 @admin.register(FocusSession)
-class FocusSessionAdmin(admin.ModelAdmin):
+class FocusSessionAdmin(LargeTableAdmin):
 	list_display = ("id", "task", "started_at", "ended_at", "duration_minutes", "success")
 	list_filter = ("success",)
+	list_select_related = ("task",)
 	search_fields = ("task__title",)
+	autocomplete_fields = ("task", "user")
+	date_hierarchy = "started_at"
 
 
 @admin.register(DaySummary)
-class DaySummaryAdmin(admin.ModelAdmin):
-	list_display = ("id", "date", "total_focused_minutes")
+class DaySummaryAdmin(LargeTableAdmin):
+	list_display = ("id", "user", "date", "total_focused_minutes")
+	list_select_related = ("user",)
 	ordering = ("-date",)
+	autocomplete_fields = ("user",)
 
 
 @admin.register(Block)
-class BlockAdmin(admin.ModelAdmin):
-	list_display = ("id", "title", "task", "done", "start_date", "end_date")
+class BlockAdmin(LargeTableAdmin):
+	list_display = ("id", "title", "task", "done", "start_date", "end_date", "recurrence")
+	list_filter = ("recurrence",)
+	list_select_related = ("task",)
 	search_fields = ("title", "task__title")
+	autocomplete_fields = ("task",)
+	date_hierarchy = "start_date"
+
+
+@admin.register(BlockException)
+class BlockExceptionAdmin(LargeTableAdmin):
+	list_display = ("id", "block", "occurrence_start", "cancelled", "done", "start_date")
+	list_select_related = ("block",)
+	autocomplete_fields = ("block",)
 
 
 @admin.register(Setting)
 class SettingAdmin(admin.ModelAdmin):
 	list_display = ("id", "user", "created_at", "updated_at")
+	list_select_related = ("user",)
+	autocomplete_fields = ("user",)
 
 
 @admin.register(Note)
-class NoteAdmin(admin.ModelAdmin):
+class NoteAdmin(LargeTableAdmin):
 	list_display = ("id", "title", "user", "background_color", "created_at")
+	list_select_related = ("user",)
 	search_fields = ("title", "content")
+	autocomplete_fields = ("user",)
+
 
+@admin.register(DeletionJob)
+class DeletionJobAdmin(admin.ModelAdmin):
+	list_display = ("id", "kind", "target_id", "user_id", "status", "rows_deleted", "created_at", "finished_at")
+	list_filter = ("status", "kind")
+	readonly_fields = ("rows_deleted", "error", "created_at", "started_at", "finished_at")
+
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(LargeTableAdmin):
+	list_display = ("id", "title", "user", "estimated_minutes", "created_at", "archived_at")
+	list_select_related = ("user",)
+	search_fields = ("title", "description")
+	autocomplete_fields = ("user",)
+
+
+@admin.register(ArchivedFocusSession)
+class ArchivedFocusSessionAdmin(LargeTableAdmin):
+	list_display = ("id", "task", "started_at", "ended_at", "duration_minutes", "success")
+	list_filter = ("success",)
+	list_select_related = ("task",)
+	autocomplete_fields = ("task",)
+
+
+@admin.register(ArchivedBlock)
+class ArchivedBlockAdmin(LargeTableAdmin):
+	list_display = ("id", "title", "task", "done", "start_date", "end_date")
+	list_select_related = ("task",)
+	autocomplete_fields = ("task",)
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core import checks  # noqa: F401
+        from core.caching import create_cache_tables
+
+        post_migrate.connect(create_cache_tables, sender=self, dispatch_uid="core-create-cache-tables")
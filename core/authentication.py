@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.models.main import AUTH_USER_CACHE_KEY
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that skips the User query while the user's state is cached.
+
+    The first request for a user loads the row as usual and caches its
+    `is_active` flag (plus the password digest when CHECK_REVOKE_TOKEN is on)
+    for JWT_AUTH_CACHE_TTL seconds. Later requests get a User instance with
+    only the id loaded; any other field is fetched on first access, so views
+    like MeView still work. Saving or deleting the user drops the cache entry.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        key = AUTH_USER_CACHE_KEY.format(user_id)
+        state = cache.get(key)
+        if state is None:
+            user = super().get_user(validated_token)
+            state = {"is_active": user.is_active, "password": None}
+            if api_settings.CHECK_REVOKE_TOKEN:
+                state["password"] = get_md5_hash_password(user.password)
+            cache.set(key, state, settings.JWT_AUTH_CACHE_TTL)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not state["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != state["password"]:
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        id_field = self.user_model._meta.get_field(api_settings.USER_ID_FIELD)
+        return self.user_model.from_db(
+            None,
+            [id_field.attname, "is_active"],
+            [id_field.to_python(user_id), state["is_active"]],
+        )
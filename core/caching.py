@@ -0,0 +1,25 @@
+"""Which cache backend is in use, and setting up the database one.
+
+Dashboard sections, replica pins, throttle buckets and cached auth state
+only work when every worker sees the same cache. See CACHES in
+config/settings/base.py.
+"""
+from django.conf import settings
+from django.core.management import call_command
+
+LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+DATABASE_BACKEND = "django.core.cache.backends.db.DatabaseCache"
+
+
+def is_shared(alias="default"):
+    """False for caches that live in (or ignore) the current process."""
+    return settings.CACHES[alias]["BACKEND"] not in LOCAL_BACKENDS
+
+
+def create_cache_tables(using="default", **kwargs):
+    """post_migrate: `createcachetable` for DatabaseCache, so `migrate` is all a deploy runs."""
+    if any(config["BACKEND"] == DATABASE_BACKEND for config in settings.CACHES.values()):
+        call_command("createcachetable", database=using, verbosity=0)
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+from django.db import connections
+
+from core.caching import is_shared
+
+SUPPORTED_VENDORS = ("postgresql", "sqlite")
+
+
+@register(Tags.database)
+def check_database_vendor(app_configs, databases=None, **kwargs):
+    """FocusSession's generated columns (MinutesBetween) only compile on these backends."""
+    errors = []
+    for alias in databases or ():
+        vendor = connections[alias].vendor
+        if vendor not in SUPPORTED_VENDORS:
+            errors.append(Error(
+                f"Database '{alias}' uses {vendor}, but FocusSession.duration_minutes and success are "
+                f"generated columns that only PostgreSQL and SQLite support.",
+                hint="Point DATABASE_URL at PostgreSQL or SQLite.",
+                id="core.E001",
+            ))
+    return errors
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Several workers with a per-process cache each see their own state."""
+    if settings.DEBUG or is_shared():
+        return []
+    return [Warning(
+        f"The default cache ({settings.CACHES['default']['BACKEND']}) is local to each process.",
+        hint="Dashboard sections are not cached and replica pins, throttle buckets and cached auth state "
+             "are per worker. Leave CACHE_URL unset (database cache) or point it at Redis.",
+        id="core.W001",
+    )]
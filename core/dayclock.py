@@ -0,0 +1,80 @@
+"""Per-user calendar days for aggregation.
+
+A user's day runs in their Setting.timezone (the server's TIME_ZONE when
+unset) and starts at the local time given by the first entry of
+Setting.day_bounds (midnight when unset): an hour number such as 4 or 4.5,
+or an "HH:MM" string. Day and period boundaries become half-open ranges on
+the raw timestamp, so the (task, started_at) indexes still apply, and
+truncation for weekly/monthly rollups happens in SQL.
+"""
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.db.models import DateTimeField, ExpressionWrapper, F, Value
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+
+def parse_day_start(day_bounds):
+    """Offset of the day start from local midnight, from Setting.day_bounds."""
+    if not isinstance(day_bounds, (list, tuple)) or not day_bounds:
+        return timedelta(0)
+    first = day_bounds[0]
+    try:
+        if isinstance(first, str):
+            hours, _, minutes = first.partition(":")
+            offset = timedelta(hours=int(hours), minutes=int(minutes or 0))
+        elif isinstance(first, (int, float)) and not isinstance(first, bool):
+            offset = timedelta(hours=first)
+        else:
+            return timedelta(0)
+    except ValueError:
+        return timedelta(0)
+    return offset if timedelta(0) <= offset < timedelta(days=1) else timedelta(0)
+
+
+def get_zone(name):
+    if name:
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    return timezone.get_default_timezone()
+
+
+class DayClock:
+    def __init__(self, tz=None, day_start=timedelta(0)):
+        self.tz = tz or timezone.get_default_timezone()
+        self.day_start = day_start
+
+    @classmethod
+    def from_setting(cls, tz_name="", day_bounds=None):
+        return cls(get_zone(tz_name), parse_day_start(day_bounds))
+
+    def day_of(self, moment):
+        """The user's calendar date that `moment` falls on."""
+        return (timezone.localtime(moment, self.tz) - self.day_start).date()
+
+    def today(self):
+        return self.day_of(timezone.now())
+
+    def start_of(self, date):
+        """Aware datetime at which `date` begins for this user."""
+        return timezone.make_aware(datetime.combine(date, time.min) + self.day_start, self.tz)
+
+    def day_range(self, date):
+        return self.start_of(date), self.start_of(date + timedelta(days=1))
+
+    def _shifted(self, field):
+        if not self.day_start:
+            return F(field)
+        return ExpressionWrapper(F(field) - Value(self.day_start), output_field=DateTimeField())
+
+    def trunc_day(self, field):
+        return TruncDate(self._shifted(field), tzinfo=self.tz)
+
+    def trunc_week(self, field):
+        return TruncWeek(self._shifted(field), tzinfo=self.tz)
+
+    def trunc_month(self, field):
+        return TruncMonth(self._shifted(field), tzinfo=self.tz)
@@ -0,0 +1,180 @@
+"""Set-based deletion of tasks and whole accounts.
+
+Django's delete collector loads every dependent row and sends post_delete
+for each one, so removing a heavy task or account takes seconds and holds
+locks throughout. Here dependants are removed children first with plain
+`DELETE ... WHERE id IN (<chunk>)` statements, each chunk in its own short
+transaction. The bookkeeping the signals would have done is done in bulk:
+sync tombstones per chunk, one dashboard bump, and one DaySummary refresh
+per affected day.
+
+Deletions above DELETION_INLINE_LIMIT rows become a DeletionJob. With
+DELETION_BACKGROUND = "thread" a job starts in a background thread once the
+request commits; `manage.py run_deletions` runs pending jobs either way and
+picks up jobs a dead process left behind.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models.main import (
+    Task,
+    FocusSession,
+    DaySummary,
+    Block,
+    BlockException,
+    Setting,
+    Note,
+    Tombstone,
+    DeletionJob,
+    ArchivedTask,
+    ArchivedFocusSession,
+    ArchivedBlock,
+    DASHBOARD_SECTIONS,
+    SYNC_MODELS,
+    bump_dashboard,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _delete_in_chunks(queryset, user_id=None, tombstones=False):
+    """DELETE the rows of `queryset` in chunks, without loading them or sending signals."""
+    model = queryset.model
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list("pk", flat=True)[:settings.DELETION_CHUNK_SIZE])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            if tombstones:
+                Tombstone.objects.bulk_create([
+                    Tombstone(user_id=user_id, model=SYNC_MODELS[model], object_id=pk) for pk in ids
+                ])
+            # One DELETE for the chunk, skipping the collector.
+            deleted += model.objects.filter(pk__in=ids)._raw_delete(model.objects.db)
+
+
+def _delete_task_rows(tasks, user_id, tombstones):
+    deleted = _delete_in_chunks(BlockException.objects.filter(block__task__in=tasks))
+    for model in (Block, FocusSession):
+        deleted += _delete_in_chunks(model.objects.filter(task__in=tasks), user_id, tombstones)
+    return deleted + _delete_in_chunks(tasks, user_id, tombstones)
+
+
+def delete_tasks(user_id, task_ids):
+    """Delete tasks of one user with their sessions and blocks; returns the row count."""
+    clock = Setting.day_clock(user_id)
+    days = list(
+        FocusSession.objects.filter(task_id__in=task_ids)
+        .annotate(day=clock.trunc_day("started_at"))
+        .values_list("day", flat=True)
+        .distinct()
+    )
+    tasks = Task.objects.filter(user_id=user_id, pk__in=task_ids)
+    deleted = _delete_task_rows(tasks, user_id, tombstones=True)
+    for day in days:
+        DaySummary.refresh(user_id, day, clock)
+    bump_dashboard(user_id, "tasks", "blocks", "weekly")
+    return deleted
+
+
+def delete_account(user_id):
+    """Delete a user and everything they own; returns the row count."""
+    tasks = Task.objects.filter(user_id=user_id)
+    # The account goes too, so no tombstones (like record_tombstone).
+    deleted = _delete_task_rows(tasks, user_id, tombstones=False)
+    for queryset in (
+        ArchivedBlock.objects.filter(task__user_id=user_id),
+        ArchivedFocusSession.objects.filter(task__user_id=user_id),
+        ArchivedTask.objects.filter(user_id=user_id),
+        Note.objects.filter(user_id=user_id),
+        DaySummary.objects.filter(user_id=user_id),
+        Setting.objects.filter(user_id=user_id),
+        Tombstone.objects.filter(user_id=user_id),
+    ):
+        deleted += _delete_in_chunks(queryset)
+    # Only the user row and small auth relations are left for the collector.
+    count, _ = get_user_model().objects.filter(pk=user_id).delete()
+    return deleted + count
+
+
+def run_job(job):
+    """Carry out a job already marked running."""
+    try:
+        if job.kind == DeletionJob.Kind.TASK:
+            rows = delete_tasks(job.user_id, [job.target_id])
+        else:
+            rows = delete_account(job.target_id)
+    except Exception as exc:
+        logger.exception("Deletion job %s failed", job.pk)
+        DeletionJob.objects.filter(pk=job.pk).update(
+            status=DeletionJob.Status.FAILED, error=str(exc), finished_at=timezone.now(),
+        )
+        return False
+    DeletionJob.objects.filter(pk=job.pk).update(
+        status=DeletionJob.Status.DONE, rows_deleted=rows, finished_at=timezone.now(),
+    )
+    return True
+
+
+def claim(job_id):
+    """Mark a pending job running; False when another worker got it first."""
+    return bool(DeletionJob.objects.filter(pk=job_id, status=DeletionJob.Status.PENDING).update(
+        status=DeletionJob.Status.RUNNING, started_at=timezone.now(),
+    ))
+
+
+def run_pending(limit=None):
+    """Run pending jobs oldest first; returns how many ran."""
+    job_ids = DeletionJob.objects.filter(status=DeletionJob.Status.PENDING).order_by("created_at")
+    ran = 0
+    for job_id in list(job_ids.values_list("pk", flat=True)[:limit]):
+        if claim(job_id):
+            run_job(DeletionJob.objects.get(pk=job_id))
+            ran += 1
+    return ran
+
+
+def requeue_stale(minutes):
+    """Put jobs running for longer than `minutes` back in the queue. Deletion is idempotent."""
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    return DeletionJob.objects.filter(status=DeletionJob.Status.RUNNING, started_at__lt=cutoff).update(
+        status=DeletionJob.Status.PENDING,
+    )
+
+
+def _run_in_thread(job_id):
+    try:
+        if claim(job_id):
+            run_job(DeletionJob.objects.get(pk=job_id))
+    finally:
+        connection.close()
+
+
+def pending_targets(user_id, kind):
+    """Ids of the user's `kind` targets with an open job, as a subquery."""
+    return DeletionJob.objects.filter(
+        user_id=user_id, kind=kind, status__in=[DeletionJob.Status.PENDING, DeletionJob.Status.RUNNING],
+    ).values("target_id")
+
+
+def enqueue(user_id, kind, target_id):
+    """The open job for this target, or a new one started after commit."""
+    job = DeletionJob.objects.filter(
+        kind=kind, target_id=target_id, status__in=[DeletionJob.Status.PENDING, DeletionJob.Status.RUNNING],
+    ).first()
+    if job is not None:
+        return job
+    job = DeletionJob.objects.create(user_id=user_id, kind=kind, target_id=target_id)
+    if kind == DeletionJob.Kind.TASK:
+        # The task drops out of the task list, dashboard and sync right away.
+        bump_dashboard(user_id, *DASHBOARD_SECTIONS[Task])
+    if settings.DELETION_BACKGROUND == "thread":
+        transaction.on_commit(lambda: threading.Thread(target=_run_in_thread, args=(job.pk,), daemon=True).start())
+    return job
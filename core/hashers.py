@@ -0,0 +1,92 @@
+"""Password hashers with work factors taken from settings.
+
+Each hasher keeps Django's algorithm name, so hashes made with Django's
+defaults still verify. When a stored hash was made with other parameters
+(or another algorithm) than the preferred hasher, Django's `check_password`
+rehashes it on the next successful login.
+
+Encoding and verifying run on a small per-process thread pool of
+PASSWORD_HASH_WORKERS threads. The request still waits for its hash,
+but a login burst can only keep that many cores busy per process. Other
+requests on a threaded worker keep running, since hashlib releases the
+GIL while it hashes. Login, registration and rehashing all go through
+these hashers, and Django's async `acheck_password` reaches them too.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def hash_pool():
+    """This process's hashing pool, or None when PASSWORD_HASH_WORKERS is 0.
+
+    Made on first use, and again after a fork: gunicorn preloads the app,
+    and a pool's threads don't survive into the forked workers.
+    """
+    global _pool, _pool_pid
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+            _pool_pid = os.getpid()
+        return _pool
+
+
+class PooledHasherMixin:
+    def encode(self, *args, **kwargs):
+        return self._run(super().encode, *args, **kwargs)
+
+    def verify(self, *args, **kwargs):
+        return self._run(super().verify, *args, **kwargs)
+
+    def _run(self, function, *args, **kwargs):
+        pool = hash_pool()
+        if pool is None or threading.current_thread().name.startswith("password-hash"):
+            return function(*args, **kwargs)
+        return pool.submit(function, *args, **kwargs).result()
+
+
+class TunedPBKDF2PasswordHasher(PooledHasherMixin, PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class TunedScryptPasswordHasher(PooledHasherMixin, ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+
+class TunedArgon2PasswordHasher(PooledHasherMixin, Argon2PasswordHasher):
+    """Needs the optional argon2-cffi package."""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
@@ -0,0 +1,155 @@
+"""Liveness and readiness probes for load balancers and autoscalers.
+
+HealthCheckMiddleware sits first in MIDDLEWARE and answers `/healthz` and
+`/readyz` itself, so probes skip host checks, sessions, auth and the URL
+resolver. `/healthz` only proves the process serves requests. `/readyz`
+pings the database under HEALTH_DB_TIMEOUT_MS, checks that no migrations
+are pending and that the cache answers, and returns 503 if any of that
+fails. Both report this worker's in-flight requests and the p95 latency of
+its requests over the last HEALTH_LATENCY_WINDOW seconds; `/readyz` adds
+connection pool stats when the database uses Django's psycopg pool.
+"""
+import math
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.http import JsonResponse
+
+HEALTH_PATH = "/healthz"
+READY_PATH = "/readyz"
+CACHE_PING_KEY = "readyz:ping"
+
+
+class LatencyRecorder:
+    """Durations of this process's recent requests."""
+
+    def __init__(self, size):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, seconds):
+        with self._lock:
+            self.in_flight -= 1
+            self._samples.append((time.monotonic(), seconds))
+
+    def snapshot(self, window):
+        since = time.monotonic() - window
+        with self._lock:
+            durations = sorted(seconds for at, seconds in self._samples if at >= since)
+            in_flight = self.in_flight
+        p95 = durations[math.ceil(len(durations) * 0.95) - 1] * 1000 if durations else None
+        return {
+            "in_flight": in_flight,
+            "requests": len(durations),
+            "window_seconds": window,
+            "p95_ms": round(p95, 1) if p95 is not None else None,
+        }
+
+
+recorder = LatencyRecorder(settings.HEALTH_LATENCY_SAMPLES)
+_migrated = False
+
+
+def check_database(alias=DEFAULT_DB_ALIAS):
+    connection = connections[alias]
+    started = time.perf_counter()
+    try:
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SET LOCAL statement_timeout = %s", [settings.HEALTH_DB_TIMEOUT_MS])
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    except DatabaseError as exc:
+        return {"ok": False, "error": str(exc)}
+    return {"ok": True, "ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+def check_migrations(alias=DEFAULT_DB_ALIAS):
+    # Loading the migration graph reads every migration file; once the
+    # schema is current it stays current for this process.
+    global _migrated
+    if not _migrated:
+        try:
+            executor = MigrationExecutor(connections[alias])
+            pending = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        except DatabaseError as exc:
+            return {"ok": False, "error": str(exc)}
+        if pending:
+            return {"ok": False, "pending": len(pending)}
+        _migrated = True
+    return {"ok": True}
+
+
+def check_cache():
+    token = time.monotonic_ns()
+    try:
+        cache.set(CACHE_PING_KEY, token, 10)
+        ok = cache.get(CACHE_PING_KEY) == token
+    except Exception as exc:  # Cache backends raise their own client errors.
+        return {"ok": False, "error": str(exc)}
+    return {"ok": ok}
+
+
+def pool_stats(alias=DEFAULT_DB_ALIAS):
+    """psycopg_pool stats when the database has OPTIONS["pool"], else None."""
+    pool = getattr(connections[alias], "pool", None)
+    return pool.get_stats() if pool is not None else None
+
+
+def _probe_response(data, status=200):
+    response = JsonResponse(data, status=status)
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+def healthz():
+    return _probe_response({"status": "ok", **recorder.snapshot(settings.HEALTH_LATENCY_WINDOW)})
+
+
+def readyz():
+    checks = {
+        "database": check_database(),
+        "migrations": check_migrations(),
+        "cache": check_cache(),
+    }
+    ready = all(check["ok"] for check in checks.values())
+    return _probe_response(
+        {
+            "status": "ok" if ready else "unavailable",
+            "checks": checks,
+            "pool": pool_stats(),
+            **recorder.snapshot(settings.HEALTH_LATENCY_WINDOW),
+        },
+        status=200 if ready else 503,
+    )
+
+
+class HealthCheckMiddleware:
+    """Answer the probes before any other middleware and time everything else."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD"):
+            if request.path == HEALTH_PATH:
+                return healthz()
+            if request.path == READY_PATH:
+                return readyz()
+
+        recorder.started()
+        started = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            recorder.finished(time.perf_counter() - started)
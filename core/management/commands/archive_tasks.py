@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models.main import Task, ArchivedTask
+
+
+class Command(BaseCommand):
+    help = "Move done tasks untouched for --days, with their sessions and blocks, into the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--user", type=int, help="Only archive tasks of this user id.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        qs = Task.objects.filter(status=Task.Status.DONE, updated_at__lt=cutoff).order_by("id")
+        if options["user"] is not None:
+            qs = qs.filter(user_id=options["user"])
+
+        archived = 0
+        while True:
+            batch = list(qs[: options["batch_size"]])
+            if not batch:
+                break
+            archived += ArchivedTask.archive(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} task(s)."))
@@ -0,0 +1,95 @@
+import random
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.deletion import delete_account
+from core.models.main import Task, FocusSession, Note, Setting
+
+
+def _seed(user, tasks, days, sessions_per_day):
+    Setting.objects.create(user=user)
+    task_ids = [Task.objects.create(user=user, title=f"Task {n}").pk for n in range(tasks)]
+    now = timezone.now()
+    sessions = []
+    for day in range(days):
+        for _ in range(sessions_per_day):
+            started = now - timedelta(days=day, minutes=random.randrange(60, 600))
+            sessions.append(FocusSession(
+                task_id=random.choice(task_ids),
+                user=user,
+                started_at=started,
+                ended_at=started + timedelta(minutes=random.randrange(5, 50)),
+            ))
+    FocusSession.objects.bulk_create(sessions, batch_size=1000)
+    note = Note.objects.create(user=user, title="Journal", content="x" * 4000)
+    return task_ids, note
+
+
+class Command(BaseCommand):
+    help = "Time a single user's API workload against the configured database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=100)
+        parser.add_argument("--tasks", type=int, default=50)
+        parser.add_argument("--days", type=int, default=180, help="Days of focus history to seed.")
+        parser.add_argument("--sessions-per-day", type=int, default=4)
+
+    def handle(self, *args, **options):
+        random.seed(0)
+        user = get_user_model().objects.create_user(username=f"bench-{uuid.uuid4().hex[:12]}")
+        try:
+            task_ids, note = _seed(user, options["tasks"], options["days"], options["sessions_per_day"])
+            # Same process as the app: no host check, no throttle.
+            with override_settings(ALLOWED_HOSTS=["*"], THROTTLE_BUCKET_CAPACITY=0):
+                timings = self._run(user, task_ids, note, options["iterations"])
+        finally:
+            delete_account(user.pk)
+
+        self.stdout.write(f"{connection.vendor} ({settings.DATABASES['default']['NAME']}), {options['iterations']} iterations")
+        for name, samples in timings.items():
+            samples.sort()
+            p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+            self.stdout.write(
+                f"{name:<12} median {statistics.median(samples) * 1000:7.2f} ms  p95 {p95 * 1000:7.2f} ms"
+            )
+
+    def _run(self, user, task_ids, note, iterations):
+        client = APIClient()
+        client.force_authenticate(user)
+        timings = {}
+
+        def timed(name, method, path, data=None):
+            started = time.perf_counter()
+            resp = getattr(client, method)(path, data, format="json")
+            timings.setdefault(name, []).append(time.perf_counter() - started)
+            if resp.status_code >= 400:
+                raise RuntimeError(f"{method.upper()} {path} returned {resp.status_code}: {resp.content[:200]!r}")
+            return resp
+
+        for n in range(iterations):
+            task_id = random.choice(task_ids)
+            timed("task list", "get", "/api/tasks/")
+            created = timed("task create", "post", "/api/tasks/", {"title": f"New {n}"}).json()
+            task_ids.append(created["id"])
+            session = timed("start focus", "post", f"/api/tasks/{task_id}/start-focus/").json()
+            timed("end focus", "post", f"/api/tasks/{task_id}/end-focus/", {"focus_session_id": session["id"]})
+            timed("move", "post", f"/api/tasks/{created['id']}/move/", {"after": task_id, "before": None})
+            content_hash = client.get(f"/api/notes/{note.pk}/").json()["content_hash"]
+            timed("note edit", "patch", f"/api/notes/{note.pk}/", {
+                "content_patch": [{"offset": 0, "delete": 1, "insert": "y"}],
+                "base_hash": content_hash,
+            })
+            timed("weekly", "get", "/api/day-summaries/weekly/?weeks=12")
+            timed("monthly", "get", "/api/day-summaries/monthly/?months=6")
+            timed("dashboard", "get", "/api/dashboard/")
+        return timings
@@ -0,0 +1,97 @@
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import FastJSONParser, FastJSONRenderer, orjson
+
+
+def _board(task_count, sessions, blocks):
+    """A /tasks/ payload shaped like TaskSerializer output."""
+    stamp = "2026-01-05T09:30:00.123000Z"
+    return [
+        {
+            "id": task_id,
+            "title": f"Task {task_id}",
+            "description": "Write the weekly report and send it around.",
+            "status": "doing",
+            "progress": 40,
+            "estimated_minutes": 120,
+            "background_color": "#FFFFFF",
+            "theme_color": "#10b981",
+            "color": "#000000",
+            "created_at": stamp,
+            "updated_at": stamp,
+            "focus_sessions": [
+                {
+                    "id": task_id * 100 + n,
+                    "task": task_id,
+                    "started_at": stamp,
+                    "ended_at": stamp,
+                    "duration_minutes": 25,
+                    "success": True,
+                    "notes": "",
+                }
+                for n in range(sessions)
+            ],
+            "blocks": [
+                {
+                    "id": task_id * 100 + n,
+                    "task": task_id,
+                    "title": f"Task {task_id}",
+                    "desc": "",
+                    "done": False,
+                    "start_date": stamp,
+                    "end_date": stamp,
+                }
+                for n in range(blocks)
+            ],
+            "total_focused_minutes": 25 * sessions,
+        }
+        for task_id in range(1, task_count + 1)
+    ]
+
+
+def _best(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+class Command(BaseCommand):
+    help = "Compare stdlib and orjson rendering/parsing of a task board payload."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=1000)
+        parser.add_argument("--sessions", type=int, default=5)
+        parser.add_argument("--blocks", type=int, default=3)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write("orjson is not installed; FastJSONRenderer uses the stdlib path.")
+
+        data = _board(options["tasks"], options["sessions"], options["blocks"])
+        repeat = options["repeat"]
+
+        body = JSONRenderer().render(data)
+        if FastJSONRenderer().render(data) != body:
+            self.stderr.write("Renderers disagree on output bytes.")
+
+        rows = [
+            ("render", lambda: JSONRenderer().render(data), lambda: FastJSONRenderer().render(data)),
+            ("parse", lambda: JSONParser().parse(BytesIO(body)), lambda: FastJSONParser().parse(BytesIO(body))),
+        ]
+        self.stdout.write(f"{options['tasks']} tasks, {len(body) / 1024:.0f} KiB")
+        for label, stdlib, fast in rows:
+            slow_time = _best(stdlib, repeat)
+            fast_time = _best(fast, repeat)
+            self.stdout.write(
+                f"{label:<7} stdlib {slow_time * 1000:7.2f} ms  fast {fast_time * 1000:7.2f} ms  "
+                f"saved {(slow_time - fast_time) * 1000:7.2f} ms ({slow_time / fast_time:.1f}x)"
+            )
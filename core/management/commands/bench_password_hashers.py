@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Time password verification for each configured hasher and report logins/s per core."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Verify from this many request threads at once; the hashing pool caps the real parallelism.",
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        concurrency = max(1, options["concurrency"])
+        password = "correct horse battery staple"
+
+        for index, hasher in enumerate(get_hashers()):
+            label = f"{hasher.algorithm}{' (preferred)' if index == 0 else ''}"
+            try:
+                encoded = hasher.encode(password, hasher.salt())
+            except ValueError as exc:
+                # Optional library (e.g. argon2-cffi) not installed.
+                self.stdout.write(f"{label:<28} skipped: {exc}")
+                continue
+
+            started = time.perf_counter()
+            for _ in range(iterations):
+                hasher.verify(password, encoded)
+            per_login = (time.perf_counter() - started) / iterations
+            line = f"{label:<28} {per_login * 1000:8.1f} ms/login  {1 / per_login:8.1f} logins/s/core"
+
+            if concurrency > 1:
+                logins = iterations * concurrency
+                with ThreadPoolExecutor(concurrency) as requests:
+                    started = time.perf_counter()
+                    list(requests.map(lambda _: hasher.verify(password, encoded), range(logins)))
+                    elapsed = time.perf_counter() - started
+                line += f"  {logins / elapsed:8.1f} logins/s with {concurrency} threads"
+            self.stdout.write(line)
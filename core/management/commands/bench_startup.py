@@ -0,0 +1,66 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+# What a gunicorn worker (or the preloading master) imports before serving.
+BOOT_SNIPPET = "import config.wsgi"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _boot(importtime=False):
+    """Boot the app in a fresh interpreter; return (seconds, stderr)."""
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", BOOT_SNIPPET]
+    started = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=os.environ.copy())
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise CommandError(f"Boot failed:\n{proc.stderr[-2000:]}")
+    return elapsed, proc.stderr
+
+
+def import_profile(stderr):
+    """Self time in microseconds per top-level package from `-X importtime` output."""
+    totals = defaultdict(int)
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        parts = name.split(".")
+        # Split the big frameworks one level down so the breakdown is useful.
+        depth = 2 if parts[0] in ("django", "rest_framework", "core", "config") else 1
+        totals[".".join(parts[:depth])] += int(match.group(1))
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+class Command(BaseCommand):
+    help = "Time a cold import of config.wsgi and break it down by package."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument("--max-ms", type=float, help="Fail when the median boot takes longer.")
+
+    def handle(self, *args, **options):
+        times = [_boot()[0] for _ in range(max(1, options["runs"]))]
+        median_ms = statistics.median(times) * 1000
+
+        _, stderr = _boot(importtime=True)
+        profile = import_profile(stderr)
+        total = sum(us for _, us in profile) or 1
+        self.stdout.write(f"{'package':<32} {'self ms':>8} {'share':>6}")
+        for name, us in profile[:options["top"]]:
+            self.stdout.write(f"{name:<32} {us / 1000:8.1f} {us / total:6.1%}")
+        self.stdout.write(f"boot median {median_ms:.0f} ms over {len(times)} runs (min {min(times) * 1000:.0f} ms)")
+
+        if options["max_ms"] is not None and median_ms > options["max_ms"]:
+            raise CommandError(f"Boot took {median_ms:.0f} ms, over the {options['max_ms']:.0f} ms budget.")
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core import partitions
+
+
+class Command(BaseCommand):
+    help = "Create upcoming monthly partitions of core_focussession (Postgres only)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months", type=int, default=3, help="Months ahead to create, including the current one.")
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Rebuild an existing unpartitioned table as a partitioned one first.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stdout.write("Partitioning is only available on PostgreSQL; nothing to do.")
+            return
+
+        with transaction.atomic():
+            if options["convert"] and partitions.convert_to_partitioned(connection, options["months"]):
+                self.stdout.write("Converted core_focussession to a partitioned table.")
+
+            if not partitions.is_partitioned(connection):
+                raise CommandError("core_focussession is not partitioned; run with --convert first.")
+
+            partitions.ensure_partitions(connection, timezone.now().date(), options["months"] + 1)
+
+        self.stdout.write(self.style.SUCCESS(f"Partitions ensured for the next {options['months']} month(s)."))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.queryplans import COST_TOLERANCE, SEED, baseline_path, check, collect, write_baseline
+
+
+class Command(BaseCommand):
+    help = "Compare EXPLAIN plans of the critical queries with the checked-in baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--update", action="store_true", help="Record new baselines instead of checking.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=COST_TOLERANCE,
+            help="Allowed relative growth of a plan's estimated cost.",
+        )
+        for name, default in SEED.items():
+            parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default, help="Seed size (--update).")
+
+    def handle(self, *args, **options):
+        if options["update"]:
+            plans = collect({name: options[name] for name in SEED})
+            write_baseline(plans)
+            count = sum(len(statements) for statements in plans["plans"].values())
+            self.stdout.write(self.style.SUCCESS(f"Recorded {count} plan(s) in {baseline_path()}."))
+            return
+
+        try:
+            problems = check(options["tolerance"])
+        except FileNotFoundError as exc:
+            raise CommandError(f"{exc}; record one with --update.")
+        if problems:
+            raise CommandError("Query plan regressions:\n" + "\n\n".join(problems))
+        self.stdout.write(self.style.SUCCESS("Query plans match the baseline."))
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.db.models.functions import Length
+
+from core.models.main import Task
+
+
+class Command(BaseCommand):
+    help = "Give task columns whose position keys grew long short, evenly spaced keys again."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-length",
+            type=int,
+            default=settings.TASK_POSITION_REBALANCE_LENGTH,
+            help="Rebalance columns with a key longer than this.",
+        )
+
+    def handle(self, *args, **options):
+        columns = (
+            Task.objects.values("user_id", "status")
+            .annotate(longest=Max(Length("position")))
+            .filter(longest__gt=options["min_length"])
+            .order_by()
+        )
+        rebalanced = 0
+        for column in columns:
+            Task.rebalance(column["user_id"], column["status"])
+            rebalanced += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebalanced {rebalanced} column(s)."))
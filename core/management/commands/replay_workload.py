@@ -0,0 +1,65 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from core.workload import DEFAULT_MIX, Replayer, load_events, parse_mix, save_events, synthetic_events
+
+
+class Command(BaseCommand):
+    help = "Replay a recorded or synthetic request mix against the API in-process and report latency per route."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", help="JSON lines of {user, action} to replay instead of a synthetic mix.")
+        parser.add_argument("--record", help="Write the synthetic mix to this file before running it.")
+        parser.add_argument("--prefix", default="load", help="Synthetic mixes use the <prefix>-* users.")
+        parser.add_argument("--requests", type=int, default=1000, help="Size of a synthetic mix.")
+        parser.add_argument(
+            "--mix",
+            default=",".join(f"{action}={weight}" for action, weight in DEFAULT_MIX.items()),
+            help="Action weights, e.g. dashboard=25,start_focus=10.",
+        )
+        parser.add_argument("--rate", type=float, default=0, help="Target requests/second; 0 sends back to back.")
+        parser.add_argument("--workers", type=int, default=1, help="Threads; each user stays on one thread.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument("--throttle", action="store_true", help="Keep the per-user rate limit on.")
+
+    def handle(self, *args, **options):
+        if options["events"]:
+            events = load_events(options["events"])
+        else:
+            usernames = sorted(
+                get_user_model().objects.filter(username__startswith=f"{options['prefix']}-")
+                .values_list("username", flat=True)
+            )
+            if not usernames:
+                raise CommandError(f"No {options['prefix']}-* users; run seed_workload first.")
+            try:
+                mix = parse_mix(options["mix"])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            events = synthetic_events(usernames, options["requests"], mix, random.Random(options["seed"]))
+            if options["record"]:
+                save_events(options["record"], events)
+
+        overrides = {"ALLOWED_HOSTS": ["*"]}
+        if not options["throttle"]:
+            overrides["THROTTLE_BUCKET_CAPACITY"] = 0
+        replayer = Replayer(rate=options["rate"], workers=options["workers"], seed=options["seed"])
+        try:
+            with override_settings(**overrides):
+                report = replayer.run(events)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(
+            f"{report['requests']} requests in {report['seconds']:.2f} s: {report['throughput']:.1f} req/s"
+            + (f" (target {options['rate']:g})" if options["rate"] else "")
+        )
+        self.stdout.write(f"{'route':<32} {'count':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for label, route in report["routes"].items():
+            self.stdout.write(
+                f"{label:<32} {route['requests']:>6} {route['errors']:>6} {route['p50_ms']:>8.2f} "
+                f"{route['p95_ms']:>8.2f} {route['p99_ms']:>8.2f} {route['max_ms']:>8.2f}"
+            )
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.deletion import requeue_stale, run_pending
+
+
+class Command(BaseCommand):
+    help = "Run pending task and account deletion jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-minutes",
+            type=int,
+            default=30,
+            help="Retry jobs that have been running for longer than this (their worker died).",
+        )
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new jobs.")
+        parser.add_argument("--interval", type=float, default=5, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            requeued = requeue_stale(options["stale_minutes"])
+            if requeued:
+                self.stdout.write(f"Requeued {requeued} stale job(s).")
+            ran = run_pending()
+            if ran or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(f"Ran {ran} deletion job(s)."))
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,54 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+
+from core.deletion import delete_account
+from core.workload import Distribution, seed
+
+
+def _distribution(spec):
+    try:
+        return Distribution(spec)
+    except ValueError as exc:
+        raise CommandError(str(exc))
+
+
+class Command(BaseCommand):
+    help = "Create synthetic users with tasks, focus history and notes for load tests."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--prefix", default="load", help="Usernames are <prefix>-<n>.")
+        parser.add_argument("--days", type=int, default=90, help="Days of focus history.")
+        parser.add_argument(
+            "--tasks-per-user", default="poisson:25",
+            help="Distribution: const:N, uniform:LOW-HIGH, poisson:MEAN or lognormal:MEDIAN,SIGMA.",
+        )
+        parser.add_argument("--sessions-per-day", default="poisson:3")
+        parser.add_argument("--session-minutes", default="lognormal:25,0.4")
+        parser.add_argument("--notes-per-user", default="poisson:5")
+        parser.add_argument("--note-size", default="lognormal:2000,1", help="Characters per note.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument("--clear", action="store_true", help="Delete existing <prefix>-* users first.")
+
+    def handle(self, *args, **options):
+        distributions = {
+            name: _distribution(options[name])
+            for name in ("tasks_per_user", "sessions_per_day", "session_minutes", "notes_per_user", "note_size")
+        }
+        prefix = options["prefix"]
+        if options["clear"]:
+            old = list(get_user_model().objects.filter(username__startswith=f"{prefix}-").values_list("pk", flat=True))
+            for user_id in old:
+                delete_account(user_id)
+            self.stdout.write(f"Deleted {len(old)} existing user(s).")
+
+        names = seed(
+            prefix,
+            options["users"],
+            days=options["days"],
+            rng=random.Random(options["seed"]),
+            **distributions,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Created {len(names)} user(s): {names[0]} .. {names[-1]}." if names else "Created no users."))
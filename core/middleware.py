@@ -0,0 +1,107 @@
+"""Negotiated response compression for API payloads.
+
+Picks the best encoding the client accepts from zstd, brotli and gzip, in
+that order. zstd and brotli are only offered when `zstandard` / `brotli` are
+installed. Only non-streaming responses whose content type is listed in
+COMPRESSION_CONTENT_TYPES and whose body is at least COMPRESSION_MIN_SIZE
+bytes are compressed; small bodies rarely get smaller and cost CPU.
+"""
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+def _gzip(content):
+    return gzip.compress(content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _brotli(content):
+    return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+
+def _zstd(content):
+    return zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compress(content)
+
+
+def available_encodings():
+    """(name, compress) pairs in order of preference."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append(("zstd", _zstd))
+    if brotli is not None:
+        encodings.append(("br", _brotli))
+    encodings.append(("gzip", _gzip))
+    return encodings
+
+
+def parse_accept_encoding(header):
+    """Map each coding in an Accept-Encoding header to its q-value."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate_encoding(header):
+    accepted = parse_accept_encoding(header)
+    best = None
+    for name, compress in available_encodings():
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > 0 and (best is None or quality > best[0]):
+            best = (quality, name, compress)
+    return best[1:] if best else None
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type not in settings.COMPRESSION_CONTENT_TYPES:
+            return response
+
+        chosen = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if chosen is None:
+            return response
+        name, compress = chosen
+
+        compressed = compress(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = name
+        # Same rule as django.middleware.gzip: the body differs, so a strong
+        # ETag no longer describes it byte for byte.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
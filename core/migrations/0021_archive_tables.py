@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:45
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_delete_emailverification'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('todo', 'To Do'), ('doing', 'General Doing'), ('today', 'Today Doing'), ('done', 'Done')], default='done', max_length=10)),
+                ('estimated_minutes', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('background_color', models.CharField(default='#FFFFFF', max_length=7)),
+                ('theme_color', models.CharField(default='#10b981', max_length=7)),
+                ('color', models.CharField(default='#000000', max_length=7)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedFocusSession',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('started_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('duration_minutes', models.PositiveIntegerField(default=0)),
+                ('success', models.BooleanField(default=False)),
+                ('notes', models.TextField(blank=True)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='focus_sessions', to='core.archivedtask')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedBlock',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('desc', models.TextField(blank=True)),
+                ('done', models.BooleanField(default=False)),
+                ('start_date', models.DateTimeField()),
+                ('end_date', models.DateTimeField()),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocks', to='core.archivedtask')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['user', '-created_at'], name='archivedtask_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedfocussession',
+            index=models.Index(fields=['started_at'], name='archivedfs_started_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:46
+
+from django.db import migrations, models
+
+from core import partitions
+
+
+def partition_focus_sessions(apps, schema_editor):
+    # Opt-in and Postgres only; a no-op on SQLite and when the setting is off.
+    if partitions.is_enabled(schema_editor.connection):
+        partitions.convert_to_partitioned(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_archive_tables'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='focussession',
+            index=models.Index(fields=['task', 'started_at'], name='focussession_task_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='focussession',
+            index=models.Index(fields=['started_at'], name='focussession_started_idx'),
+        ),
+        migrations.RunPython(partition_focus_sessions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:54
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_summaries(apps, schema_editor):
+    """Fold duplicate (user, date) rows into the oldest one before adding the constraint."""
+    DaySummary = apps.get_model("core", "DaySummary")
+    duplicates = (
+        DaySummary.objects.values("user_id", "date")
+        .annotate(rows=Count("id"))
+        .filter(rows__gt=1)
+    )
+    for dup in duplicates:
+        rows = list(DaySummary.objects.filter(user_id=dup["user_id"], date=dup["date"]).order_by("id"))
+        keep = rows[0]
+        texts = []
+        for row in rows:
+            if row.summary_text and row.summary_text not in texts:
+                texts.append(row.summary_text)
+        # The next session save or /recompute/ corrects the total; until then
+        # keep the largest one rather than summing double-counted rows.
+        keep.total_focused_minutes = max(row.total_focused_minutes for row in rows)
+        keep.summary_text = "\n\n".join(texts)
+        keep.save(update_fields=["total_focused_minutes", "summary_text"])
+        DaySummary.objects.filter(id__in=[row.id for row in rows[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_sync_updated_at_and_tombstones'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_summaries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='daysummary',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='unique_daysummary_user_date'),
+        ),
+    ]
@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+import django.db.models.deletion
+
+from core import partitions
+
+
+OPEN_SESSION_CONSTRAINT = models.UniqueConstraint(
+    fields=["user"],
+    condition=models.Q(ended_at__isnull=True),
+    name="focussession_one_open_per_user",
+)
+
+
+def backfill_focus_session_user(apps, schema_editor):
+    FocusSession = apps.get_model("core", "FocusSession")
+    Task = apps.get_model("core", "Task")
+    FocusSession.objects.filter(user__isnull=True).update(
+        user_id=Subquery(Task.objects.filter(pk=OuterRef("task_id")).values("user_id")[:1])
+    )
+
+
+def close_duplicate_open_sessions(apps, schema_editor):
+    """Leave each user at most one open session, the newest, so the guard can be added.
+
+    Older open sessions end when the newest one started, and the day
+    summaries they fall on are recomputed.
+    """
+    FocusSession = apps.get_model("core", "FocusSession")
+    ArchivedFocusSession = apps.get_model("core", "ArchivedFocusSession")
+    DaySummary = apps.get_model("core", "DaySummary")
+    duplicated = (
+        FocusSession.objects.filter(ended_at__isnull=True)
+        .values("user_id")
+        .annotate(open_count=models.Count("id"))
+        .filter(open_count__gt=1)
+        .values_list("user_id", flat=True)
+    )
+    for user_id in list(duplicated):
+        newest, *stale = FocusSession.objects.filter(user_id=user_id, ended_at__isnull=True).order_by("-started_at", "-id")
+        days = set()
+        for session in stale:
+            session.ended_at = max(newest.started_at, session.started_at)
+            session.duration_minutes = int((session.ended_at - session.started_at).total_seconds() // 60)
+            session.success = session.duration_minutes >= 1
+            session.save(update_fields=["ended_at", "duration_minutes", "success", "updated_at"])
+            days.add(timezone.localtime(session.started_at).date())
+        for day in days:
+            minutes = 0
+            for model in (FocusSession, ArchivedFocusSession):
+                minutes += (
+                    model.objects.filter(task__user_id=user_id, started_at__date=day)
+                    .aggregate(total=models.Sum("duration_minutes"))["total"] or 0
+                )
+            DaySummary.objects.update_or_create(
+                user_id=user_id, date=day, defaults={"total_focused_minutes": minutes},
+            )
+
+
+def _open_session_index():
+    # Postgres can't enforce a unique index on a partitioned table without the
+    # partition key; there the index only speeds up the active lookup and
+    # FocusSession.start()'s NOT EXISTS check does the guarding.
+    return models.Index(
+        fields=["user"],
+        condition=models.Q(ended_at__isnull=True),
+        name=OPEN_SESSION_CONSTRAINT.name,
+    )
+
+
+def add_open_session_guard(apps, schema_editor):
+    FocusSession = apps.get_model("core", "FocusSession")
+    if partitions.is_partitioned(schema_editor.connection):
+        schema_editor.add_index(FocusSession, _open_session_index())
+    else:
+        schema_editor.add_constraint(FocusSession, OPEN_SESSION_CONSTRAINT)
+
+
+def remove_open_session_guard(apps, schema_editor):
+    FocusSession = apps.get_model("core", "FocusSession")
+    if partitions.is_partitioned(schema_editor.connection):
+        schema_editor.remove_index(FocusSession, _open_session_index())
+    else:
+        schema_editor.remove_constraint(FocusSession, OPEN_SESSION_CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0024_restore_daysummary_unique"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="focussession",
+            name="user",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="focus_sessions",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(backfill_focus_session_user, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="focussession",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="focus_sessions",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(close_duplicate_open_sessions, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddConstraint(model_name="focussession", constraint=OPEN_SESSION_CONSTRAINT),
+            ],
+            database_operations=[
+                migrations.RunPython(add_open_session_guard, remove_open_session_guard),
+            ],
+        ),
+    ]
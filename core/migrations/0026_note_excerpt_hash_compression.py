@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:10
+
+import hashlib
+
+from django.db import DatabaseError, migrations, models, transaction
+
+EXCERPT_LENGTH = 280
+
+
+def backfill_note_fields(apps, schema_editor):
+    Note = apps.get_model("core", "Note")
+    batch = []
+    for note in Note.objects.only("id", "content").iterator(chunk_size=500):
+        note.excerpt = note.content[:EXCERPT_LENGTH]
+        note.content_hash = hashlib.sha256(note.content.encode("utf-8")).hexdigest()
+        note.content_size = len(note.content)
+        batch.append(note)
+        if len(batch) >= 500:
+            Note.objects.bulk_update(batch, ["excerpt", "content_hash", "content_size"])
+            batch = []
+    if batch:
+        Note.objects.bulk_update(batch, ["excerpt", "content_hash", "content_size"])
+
+
+def compress_note_content(apps, schema_editor):
+    # Postgres already compresses large values when it TOASTs them; lz4
+    # (PostgreSQL 14+, when the server is built with it) is much cheaper to
+    # compress and decompress than the default pglz. Skipped elsewhere.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute("ALTER TABLE core_note ALTER COLUMN content SET COMPRESSION lz4")
+    except DatabaseError:
+        pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_focussession_user_open_guard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=280),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='content_size',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_note_fields, migrations.RunPython.noop),
+        migrations.RunPython(compress_note_content, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+from core.ordering import spaced_keys
+
+
+def backfill_positions(apps, schema_editor):
+    """Number every column in its current newest-first order."""
+    Task = apps.get_model("core", "Task")
+    columns = Task.objects.values_list("user_id", "status").distinct()
+    for user_id, status in columns:
+        tasks = list(Task.objects.filter(user_id=user_id, status=status).order_by("-created_at").only("id"))
+        for task, key in zip(tasks, spaced_keys(len(tasks))):
+            task.position = key
+        Task.objects.bulk_update(tasks, ["position"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_block_recurrence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtask',
+            name='position',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='position',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunPython(backfill_positions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'status', 'position'], name='task_user_status_position_idx'),
+        ),
+    ]
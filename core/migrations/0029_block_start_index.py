@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_task_position'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='block',
+            index=models.Index(fields=['start_date'], name='block_start_idx'),
+        ),
+    ]
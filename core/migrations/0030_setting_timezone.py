@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:15
+
+import core.models.main
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_block_start_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='setting',
+            name='timezone',
+            field=models.CharField(blank=True, default='', max_length=64, validators=[core.models.main.validate_timezone_name]),
+        ),
+    ]
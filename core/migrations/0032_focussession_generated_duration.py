@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:21
+
+import core.models.main
+import django.db.models.lookups
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_deletionjob'),
+    ]
+
+    # Django can't alter a column into a generated one, so both are dropped
+    # and re-added; the database fills them in from started_at/ended_at.
+    operations = [
+        migrations.RemoveField(
+            model_name='focussession',
+            name='duration_minutes',
+        ),
+        migrations.RemoveField(
+            model_name='focussession',
+            name='success',
+        ),
+        migrations.AddField(
+            model_name='focussession',
+            name='duration_minutes',
+            field=models.GeneratedField(db_persist=True, expression=core.models.main.MinutesBetween('started_at', 'ended_at'), output_field=models.PositiveIntegerField()),
+        ),
+        migrations.AddField(
+            model_name='focussession',
+            name='success',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.lookups.GreaterThanOrEqual(core.models.main.MinutesBetween('started_at', 'ended_at'), 1), output_field=models.BooleanField()),
+        ),
+    ]
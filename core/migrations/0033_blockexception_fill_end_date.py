@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def fill_end_date(apps, schema_editor):
+    """Overrides that moved only the start keep the block's duration."""
+    BlockException = apps.get_model("core", "BlockException")
+    moved = BlockException.objects.filter(start_date__isnull=False, end_date__isnull=True).select_related("block")
+    for exception in moved.iterator():
+        exception.end_date = exception.start_date + (exception.block.end_date - exception.block.start_date)
+        exception.save(update_fields=["end_date"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_focussession_generated_duration'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_end_date, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,86 @@
-from django.db import models
+import hashlib
+from django.db import NotSupportedError, connection, models, transaction
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.utils import timezone
-from datetime import timedelta
-from django.db.models import Sum
+from time import time_ns
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.db.models import Subquery, Sum
+from django.db.models.lookups import GreaterThanOrEqual
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
+from core.dayclock import DayClock
+from core.ordering import key_between, spaced_keys
+
+POSITION_MAX_LENGTH = 64
+
+# Cached auth state per user, see core.authentication.CachedJWTAuthentication.
+AUTH_USER_CACHE_KEY = "jwt-user:{}"
+
+# Per-user, per-section version stamps for the dashboard cache (core.views.dashboard).
+DASHBOARD_VERSION_KEY = "dashboard:{}:{}:version"
+
+
+def dashboard_version(user_id, section):
+    key = DASHBOARD_VERSION_KEY.format(user_id, section)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time_ns(), None)
+        version = cache.get(key, 0)
+    return version
+
+
+def bump_dashboard(user_id, *sections):
+    """Invalidate the given dashboard sections of one user."""
+    stamp = time_ns()
+    cache.set_many({DASHBOARD_VERSION_KEY.format(user_id, section): stamp for section in sections}, None)
+
+
+def validate_timezone_name(value):
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f"{value!r} is not a known time zone.")
+
+
+def content_digest(text):
+    """SHA-256 hex digest of a note body, the base for incremental edits."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class MinutesBetween(models.Func):
+    """Whole minutes from `start` to `end`, floored at 0; 0 while `end` is NULL.
+
+    Immutable on PostgreSQL and SQLite, so it can back a generated column.
+    Other backends are refused up front by the core.E001 system check.
+    """
+    arity = 2
+    output_field = models.IntegerField()
+
+    def _template_sql(self, compiler, template):
+        (start, start_params), (end, end_params) = (compiler.compile(e) for e in self.get_source_expressions())
+        return template.format(start=start, end=end), [*end_params, *start_params]
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(f"MinutesBetween is only available on PostgreSQL and SQLite, not {connection.vendor}")
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self._template_sql(
+            compiler, "COALESCE(GREATEST(0, FLOOR(EXTRACT(EPOCH FROM ({end} - {start})) / 60))::integer, 0)",
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # Round to whole milliseconds first: julianday() is a float.
+        return self._template_sql(
+            compiler,
+            "COALESCE(MAX(0, CAST(ROUND((julianday({end}) - julianday({start})) * 86400000) AS INTEGER) / 60000), 0)",
+        )
+
+
 class Task(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -38,6 +112,67 @@ class Task(models.Model):
     theme_color = models.CharField(max_length=7, default="#10b981", validators=[hex_color_validator])
     color = models.CharField(max_length=7, default="#000000", validators=[hex_color_validator])
 
+    # Manual order inside a status column; a core.ordering key.
+    position = models.CharField(max_length=POSITION_MAX_LENGTH, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "updated_at"], name="task_user_updated_idx"),
+            models.Index(fields=["user", "status", "position"], name="task_user_status_position_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        task = super().from_db(db, field_names, values)
+        task._loaded_column = (task.__dict__.get("status"), task.__dict__.get("position"))
+        return task
+
+    def save(self, *args, **kwargs):
+        loaded_status, loaded_position = getattr(self, "_loaded_column", (None, None))
+        if loaded_status is not None and self.status != loaded_status and self.position == loaded_position:
+            # Changed column without an explicit move: the old key means
+            # nothing in the new column and may clash, so take a new one.
+            self.position = ""
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | {"position"}
+        if not self.position:
+            # New tasks go to the top of their column, like the old newest-first order.
+            key = key_between(None, self._first_position())
+            if len(key) > POSITION_MAX_LENGTH:
+                Task.rebalance(self.user_id, self.status)
+                key = key_between(None, self._first_position())
+            self.position = key
+        super().save(*args, **kwargs)
+        self._loaded_column = (self.status, self.position)
+
+    def _first_position(self):
+        return (
+            Task.objects.filter(user_id=self.user_id, status=self.status)
+            .exclude(position="")
+            .order_by("position")
+            .values_list("position", flat=True)
+            .first()
+        )
+
+    @classmethod
+    def rebalance(cls, user_id, status):
+        """Give one column short, evenly spaced keys, keeping its order."""
+        with transaction.atomic():
+            tasks = list(
+                cls.objects.select_for_update()
+                .filter(user_id=user_id, status=status)
+                .order_by("position", "-created_at")
+                .only("id", "position", "updated_at")
+            )
+            now = timezone.now()
+            for task, key in zip(tasks, spaced_keys(len(tasks))):
+                task.position = key
+                task.updated_at = now
+            cls.objects.bulk_update(tasks, ["position", "updated_at"], batch_size=500)
+        bump_dashboard(user_id, "tasks")
+        return len(tasks)
+
     def progress(self):
         if self.estimated_minutes == 0:
             return 0
@@ -54,27 +189,113 @@ class Task(models.Model):
 
 class FocusSession(models.Model):
     task = models.ForeignKey(Task, related_name="focus_sessions", on_delete=models.CASCADE)
+    # Copy of task.user_id so the one-open-session rule can be an index.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="focus_sessions",
+    )
 
     started_at = models.DateTimeField(default=timezone.now)
     ended_at = models.DateTimeField(null=True, blank=True)
 
-    duration_minutes = models.PositiveIntegerField(default=0)
-    success = models.BooleanField(default=False)
+    # Computed by the database, so update(), bulk_create() and raw SQL that
+    # only touch the timestamps keep them right. A session counts as a
+    # success once it lasted a minute.
+    duration_minutes = models.GeneratedField(
+        expression=MinutesBetween("started_at", "ended_at"),
+        output_field=models.PositiveIntegerField(),
+        db_persist=True,
+    )
+    success = models.GeneratedField(
+        expression=GreaterThanOrEqual(MinutesBetween("started_at", "ended_at"), 1),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
     notes = models.TextField(blank=True)
 
-    def save(self, *args, **kwargs):
-        # Auto compute duration if ended_at is provided
-        if self.started_at and self.ended_at:
-            delta = self.ended_at - self.started_at
-            # Recalculate duration only if it wasn't manually overridden or if it's 0
-            computed_minutes = max(0, int(delta.total_seconds() // 60))
-            if self.duration_minutes == 0 or self.duration_minutes != computed_minutes:
-                self.duration_minutes = computed_minutes
+    updated_at = models.DateTimeField(auto_now=True)
 
-        # Enforce success rule: false if duration under 10 minutes
-        self.success = self.duration_minutes >= 1
+    class Meta:
+        # Range scans on started_at back the weekly/monthly/day rollups. On
+        # Postgres the table may be range partitioned by month (core.partitions).
+        indexes = [
+            models.Index(fields=["task", "started_at"], name="focussession_task_started_idx"),
+            models.Index(fields=["started_at"], name="focussession_started_idx"),
+            models.Index(fields=["updated_at"], name="focussession_updated_idx"),
+        ]
+        # At most one running session per user. Unique only on unpartitioned
+        # tables; see migration 0025.
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=models.Q(ended_at__isnull=True),
+                name="focussession_one_open_per_user",
+            ),
+        ]
 
+    def save(self, *args, **kwargs):
+        if self.user_id is None:
+            self.user_id = self.task.user_id
+        updating = not self._state.adding
         super().save(*args, **kwargs)
+        if updating:
+            # INSERT returns the generated columns, UPDATE doesn't; drop the
+            # stale values so the next access reloads them.
+            for name in ("duration_minutes", "success"):
+                self.__dict__.pop(name, None)
+
+    @classmethod
+    def _returning(cls, sql, params):
+        """Run a single INSERT/UPDATE ... RETURNING and load the row, if any."""
+        rows = list(cls.objects.raw(sql, params))
+        return rows[0] if rows else None
+
+    @classmethod
+    def _columns(cls):
+        qn = connection.ops.quote_name
+        return ", ".join(qn(f.column) for f in cls._meta.concrete_fields)
+
+    @classmethod
+    def start(cls, task_id, user_id):
+        """Open a session on the user's task in one statement.
+
+        Returns None when the task isn't the user's or a session is already
+        open. Raises IntegrityError if a concurrent start won the race.
+        """
+        qn = connection.ops.quote_name
+        table = qn(cls._meta.db_table)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        sql = (
+            f"INSERT INTO {table} (task_id, user_id, started_at, ended_at, notes, updated_at) "
+            f"SELECT t.id, t.user_id, %s, NULL, '', %s FROM {qn(Task._meta.db_table)} t "
+            f"WHERE t.id = %s AND t.user_id = %s "
+            f"AND NOT EXISTS (SELECT 1 FROM {table} o WHERE o.user_id = %s AND o.ended_at IS NULL) "
+            f"RETURNING {cls._columns()}"
+        )
+        session = cls._returning(sql, [now, now, task_id, user_id, user_id])
+        if session is not None:
+            bump_dashboard(user_id, "tasks", "weekly")
+        return session
+
+    @classmethod
+    def end(cls, session_id, task_id, user_id):
+        """Close an open session in one UPDATE ... RETURNING, or return None.
+
+        Duration and success are generated columns and come back with the
+        row. The caller is responsible for refreshing the DaySummary.
+        """
+        table = connection.ops.quote_name(cls._meta.db_table)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        sql = (
+            f"UPDATE {table} SET ended_at = %s, updated_at = %s "
+            f"WHERE id = %s AND task_id = %s AND user_id = %s AND ended_at IS NULL "
+            f"RETURNING {cls._columns()}"
+        )
+        session = cls._returning(sql, [now, now, session_id, task_id, user_id])
+        if session is not None:
+            bump_dashboard(user_id, "tasks", "weekly")
+        return session
 
     def __str__(self):
         return f"Focus Session {self.task_id} - {self.duration_minutes}m"
@@ -92,17 +313,54 @@ class DaySummary(models.Model):
 
     total_focused_minutes = models.PositiveIntegerField(default=0)
 
-    def recompute(self):
-        """Recalculate the total focus minutes for the day."""
-        # FIX: Use __date lookup. This handles timezone conversion automatically
-        # and lets PostgreSQL do the heavy lifting.
-        minutes_qs = FocusSession.objects.filter(started_at__date=self.date)
-        if self.user_id is not None:
-            minutes_qs = minutes_qs.filter(task__user_id=self.user_id)
+    updated_at = models.DateTimeField(auto_now=True)
 
-        minutes = minutes_qs.aggregate(total=Sum("duration_minutes"))["total"] or 0
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "date"], name="unique_daysummary_user_date"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "updated_at"], name="daysummary_user_updated_idx"),
+        ]
+
+    @classmethod
+    def focused_minutes(cls, user_id, date, clock=None):
+        """Total focus minutes of `user_id` on their calendar `date`, archived sessions included."""
+        # Filter on a half-open started_at range rather than __date so the
+        # index (and partition pruning on Postgres) can be used.
+        if clock is None:
+            clock = Setting.day_clock(user_id) if user_id is not None else DayClock()
+        day_start, day_end = clock.day_range(date)
+
+        minutes = 0
+        for model in (FocusSession, ArchivedFocusSession):
+            minutes_qs = model.objects.filter(started_at__gte=day_start, started_at__lt=day_end)
+            if user_id is not None:
+                minutes_qs = minutes_qs.filter(task__user_id=user_id)
+            minutes += minutes_qs.aggregate(total=Sum("duration_minutes"))["total"] or 0
+        return minutes
+
+    @classmethod
+    def refresh(cls, user_id, date, clock=None):
+        """Insert or update the (user, date) summary with recomputed minutes.
+
+        A single INSERT ... ON CONFLICT DO UPDATE, so concurrent callers can't
+        create duplicates. `summary_text` of an existing row is left alone.
+        """
+        minutes = cls.focused_minutes(user_id, date, clock)
+        summary = cls(user_id=user_id, date=date, total_focused_minutes=minutes)
+        cls.objects.bulk_create(
+            [summary],
+            update_conflicts=True,
+            unique_fields=["user", "date"],
+            update_fields=["total_focused_minutes", "updated_at"],
+        )
+        bump_dashboard(user_id, "day_summaries")
+        return summary
 
-        self.total_focused_minutes = minutes
+    def recompute(self):
+        """Recalculate the total focus minutes for the day."""
+        self.total_focused_minutes = self.focused_minutes(self.user_id, self.date)
         self.save()
 
     def __str__(self):
@@ -120,6 +378,27 @@ class Block(models.Model):
     start_date = models.DateTimeField(default=timezone.now)
     end_date = models.DateTimeField(default=timezone.now)
 
+    class Recurrence(models.TextChoices):
+        NONE = "", "None"
+        DAILY = "daily", "Daily"
+        WEEKLY = "weekly", "Weekly"
+
+    # A recurring block is one row; start_date/end_date are its first
+    # occurrence and core.recurrence expands the rest on demand.
+    recurrence = models.CharField(max_length=10, choices=Recurrence.choices, default=Recurrence.NONE, blank=True)
+    recurrence_interval = models.PositiveSmallIntegerField(default=1)
+    recurrence_weekdays = models.JSONField(default=list, blank=True)  # 0 = Monday; weekly only
+    recurrence_until = models.DateTimeField(null=True, blank=True)
+    recurrence_count = models.PositiveIntegerField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["updated_at"], name="block_updated_idx"),
+            models.Index(fields=["start_date"], name="block_start_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.title:
             self.title = self.task.title
@@ -133,6 +412,32 @@ class Block(models.Model):
         return f"Block: {self.title} ({self.start_date.isoformat()})"
 
 
+class BlockException(models.Model):
+    """Override of one occurrence of a recurring Block, keyed by its original start."""
+    block = models.ForeignKey(
+        Block,
+        on_delete=models.CASCADE,
+        related_name="exceptions",
+    )
+
+    occurrence_start = models.DateTimeField()
+    cancelled = models.BooleanField(default=False)
+    done = models.BooleanField(default=False)
+    # Set when the occurrence was moved.
+    start_date = models.DateTimeField(null=True, blank=True)
+    end_date = models.DateTimeField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["block", "occurrence_start"], name="blockexception_unique_occurrence"),
+        ]
+
+    def __str__(self):
+        return f"Exception for block {self.block_id} at {self.occurrence_start.isoformat()}"
+
+
 class Setting(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
@@ -142,10 +447,18 @@ class Setting(models.Model):
 
     day_bounds = models.JSONField(default=list, blank=True)
     column_colors = models.JSONField(default=list, blank=True)
+    # IANA name such as "Europe/Berlin"; empty means the server's TIME_ZONE.
+    timezone = models.CharField(max_length=64, blank=True, default="", validators=[validate_timezone_name])
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    @classmethod
+    def day_clock(cls, user_id):
+        """The DayClock aggregations for this user bucket by."""
+        row = cls.objects.filter(user_id=user_id).values("timezone", "day_bounds").first() or {}
+        return DayClock.from_setting(row.get("timezone", ""), row.get("day_bounds"))
+
     def __str__(self):
         return f"Setting for user {self.user_id}"
 
@@ -159,6 +472,10 @@ class Note(models.Model):
 
     title = models.CharField(max_length=200)
     content = models.TextField(blank=True)
+    # Derived from `content` on save; lists return these instead of the body.
+    excerpt = models.CharField(max_length=280, blank=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    content_size = models.PositiveIntegerField(default=0, editable=False)
 
     background_color = models.CharField(
         max_length=7,
@@ -174,16 +491,268 @@ class Note(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "updated_at"], name="note_user_updated_idx"),
+        ]
+
+    def refresh_content_fields(self):
+        self.excerpt = self.content[:self._meta.get_field("excerpt").max_length]
+        self.content_hash = content_digest(self.content)
+        self.content_size = len(self.content)
+
+    def save(self, *args, **kwargs):
+        self.refresh_content_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "content" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"excerpt", "content_hash", "content_size"}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.title
 
 
+class Tombstone(models.Model):
+    """Records a deleted row so /sync/ can tell clients to drop it."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="tombstones",
+    )
+
+    model = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "deleted_at"], name="tombstone_user_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"Deleted {self.model} {self.object_id}"
+
+
+class DeletionJob(models.Model):
+    """A large task or account deletion, carried out by core.deletion."""
+
+    class Kind(models.TextChoices):
+        TASK = "task", "Task"
+        ACCOUNT = "account", "Account"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    # Plain ids: the job outlives the rows it deletes, the user included.
+    user_id = models.BigIntegerField()
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    target_id = models.BigIntegerField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    rows_deleted = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="deletionjob_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"Delete {self.kind} {self.target_id} ({self.status})"
+
+
+def _copy_fields(instance, model, **extra):
+    """Build an unsaved `model` row from the matching concrete fields of `instance`."""
+    names = {f.attname for f in model._meta.concrete_fields}
+    values = {
+        f.attname: getattr(instance, f.attname)
+        for f in instance._meta.concrete_fields
+        if f.attname in names
+    }
+    values.update(extra)
+    return model(**values)
+
+
+class ArchivedTask(models.Model):
+    """A done Task moved out of the hot tables. Keeps the original id."""
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_tasks",
+    )
+
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=Task.Status.choices, default=Task.Status.DONE)
+
+    estimated_minutes = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    background_color = models.CharField(max_length=7, default="#FFFFFF")
+    theme_color = models.CharField(max_length=7, default="#10b981")
+    color = models.CharField(max_length=7, default="#000000")
+    position = models.CharField(max_length=POSITION_MAX_LENGTH, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="archivedtask_user_created_idx"),
+        ]
+
+    def progress(self):
+        if self.estimated_minutes == 0:
+            return 0
+        focused = self.total_focused_minutes()
+        return min(100, int((focused / self.estimated_minutes) * 100))
+
+    def total_focused_minutes(self):
+        return self.focus_sessions.aggregate(total=Sum("duration_minutes"))["total"] or 0
+
+    @classmethod
+    def archive(cls, tasks):
+        """Move `tasks` with their focus sessions and blocks into the archive tables.
+
+        Rows are copied with their ids, then the originals are deleted in the
+        same transaction. Stored DaySummary totals are left untouched and
+        `DaySummary.recompute` keeps counting the archived sessions.
+        """
+        tasks = list(tasks)
+        if not tasks:
+            return 0
+
+        task_ids = [task.id for task in tasks]
+        now = timezone.now()
+        with transaction.atomic():
+            cls.objects.bulk_create([_copy_fields(task, cls, archived_at=now) for task in tasks])
+            ArchivedFocusSession.objects.bulk_create([
+                _copy_fields(fs, ArchivedFocusSession)
+                for fs in FocusSession.objects.filter(task_id__in=task_ids)
+            ])
+            ArchivedBlock.objects.bulk_create([
+                _copy_fields(block, ArchivedBlock)
+                for block in Block.objects.filter(task_id__in=task_ids)
+            ])
+            Task.objects.filter(id__in=task_ids).delete()
+        return len(task_ids)
+
+    def __str__(self):
+        return f"{self.title} (archived)"
+
+
+class ArchivedFocusSession(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(ArchivedTask, related_name="focus_sessions", on_delete=models.CASCADE)
+
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField(null=True, blank=True)
+
+    duration_minutes = models.PositiveIntegerField(default=0)
+    success = models.BooleanField(default=False)
+    notes = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["started_at"], name="archivedfs_started_idx"),
+        ]
+
+    def __str__(self):
+        return f"Archived Focus Session {self.task_id} - {self.duration_minutes}m"
+
+
+class ArchivedBlock(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(ArchivedTask, related_name="blocks", on_delete=models.CASCADE)
+
+    title = models.CharField(max_length=200, blank=True)
+    desc = models.TextField(blank=True)
+    done = models.BooleanField(default=False)
+
+    start_date = models.DateTimeField()
+    end_date = models.DateTimeField()
+
+    recurrence = models.CharField(max_length=10, choices=Block.Recurrence.choices, default="", blank=True)
+    recurrence_interval = models.PositiveSmallIntegerField(default=1)
+    recurrence_weekdays = models.JSONField(default=list, blank=True)
+    recurrence_until = models.DateTimeField(null=True, blank=True)
+    recurrence_count = models.PositiveIntegerField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Archived Block: {self.title} ({self.start_date.isoformat()})"
+
+
 @receiver(post_save, sender=FocusSession)
 def update_day_summary(sender, instance, **kwargs):
-    session_date = timezone.localdate(instance.started_at)
-    summary, created = DaySummary.objects.get_or_create(
-        user=instance.task.user,
-        date=session_date,
-    )
-    
-    summary.recompute()
\ No newline at end of file
+    clock = Setting.day_clock(instance.user_id)
+    DaySummary.refresh(instance.user_id, clock.day_of(instance.started_at), clock)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_auth_cache(sender, instance, **kwargs):
+    cache.delete(AUTH_USER_CACHE_KEY.format(instance.pk))
+
+
+# Sync names of the models that leave a Tombstone behind when deleted.
+SYNC_MODELS = {
+    Task: "tasks",
+    FocusSession: "focus_sessions",
+    Block: "blocks",
+    Note: "notes",
+    Setting: "settings",
+    DaySummary: "day_summaries",
+}
+
+
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    origin_model = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    if issubclass(origin_model, get_user_model()):
+        # The whole account is going away, tombstones included.
+        return
+    if hasattr(instance, "user_id"):
+        user_id = instance.user_id
+    else:
+        user_id = Subquery(Task.objects.filter(pk=instance.task_id).values("user_id")[:1])
+    Tombstone.objects.create(user_id=user_id, model=SYNC_MODELS[sender], object_id=instance.pk)
+
+
+for _model in SYNC_MODELS:
+    post_delete.connect(record_tombstone, sender=_model, dispatch_uid=f"tombstone-{_model.__name__}")
+
+
+# Dashboard sections that depend on each model. Deleting a task takes its
+# sessions and blocks along, so it covers their sections too.
+DASHBOARD_SECTIONS = {
+    Task: ("tasks", "blocks", "weekly"),
+    FocusSession: ("tasks", "weekly"),
+    Block: ("tasks", "blocks"),
+    Note: ("notes",),
+    Setting: ("setting", "weekly"),
+    DaySummary: ("day_summaries",),
+}
+
+
+def invalidate_dashboard(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, (Task, get_user_model())) and not isinstance(instance, type(origin)):
+        # Cascade: the task's (or account's) own signal already covers this row.
+        return
+    user_id = instance.user_id if hasattr(instance, "user_id") else instance.task.user_id
+    bump_dashboard(user_id, *DASHBOARD_SECTIONS[sender])
+
+
+for _model in DASHBOARD_SECTIONS:
+    post_save.connect(invalidate_dashboard, sender=_model, dispatch_uid=f"dashboard-save-{_model.__name__}")
+    post_delete.connect(invalidate_dashboard, sender=_model, dispatch_uid=f"dashboard-delete-{_model.__name__}")
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_dashboard_me(sender, instance, **kwargs):
+    bump_dashboard(instance.pk, "me")
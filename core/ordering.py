@@ -0,0 +1,58 @@
+"""Fractional-index keys for manual ordering.
+
+A key is a base-36 fraction written without the leading "0." and without
+trailing zeros, so comparing keys as strings compares their values and
+there is always room for another key between two neighbours. Moving an item
+only rewrites that item's key. Keys grow by roughly one character per five
+inserts at the same spot; `spaced_keys` hands out short, evenly spaced keys
+again when a column is rebalanced. The alphabet is lowercase letters and
+digits only, so database collations order keys the same way Python does.
+"""
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+
+def _midpoint(a, b):
+    # `a` is "" for the lower bound 0, `b` None for the upper bound 1.
+    if b is not None:
+        n = 0
+        while (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    low = DIGITS.index(a[0]) if a else 0
+    high = DIGITS.index(b[0]) if b is not None else BASE
+    if high - low > 1:
+        return DIGITS[(low + high) // 2]
+    if b is not None and len(b) > 1:
+        # b's first digit alone is greater than a and smaller than b.
+        return b[0]
+    return DIGITS[low] + _midpoint(a[1:], None)
+
+
+def key_between(before, after):
+    """A key sorting strictly after `before` and before `after`; None leaves that side open."""
+    for key in (before, after):
+        if key is not None and (not key or key.endswith(DIGITS[0]) or key.strip(DIGITS)):
+            raise ValueError(f"Invalid position key: {key!r}")
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"{before!r} does not sort before {after!r}")
+    return _midpoint(before or "", after)
+
+
+def spaced_keys(count):
+    """`count` short keys in ascending order, spread evenly over the key space."""
+    width = 1
+    while BASE ** width <= count:
+        width += 1
+    step = BASE ** width // (count + 1)
+    keys = []
+    for i in range(1, count + 1):
+        value = i * step
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        keys.append("".join(reversed(digits)).rstrip(DIGITS[0]))
+    return keys
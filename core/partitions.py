@@ -0,0 +1,176 @@
+"""Monthly range partitioning of the FocusSession table on PostgreSQL.
+
+Partitioning is opt-in (``FOCUS_SESSION_PARTITIONING``). On other backends,
+or when the setting is off, every helper here is a no-op so the same
+migrations run against SQLite in tests.
+"""
+import re
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.conf import settings
+
+TABLE = "core_focussession"
+LEGACY_TABLE = f"{TABLE}_legacy"
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+
+def is_enabled(connection):
+    return connection.vendor == "postgresql" and getattr(settings, "FOCUS_SESSION_PARTITIONING", False)
+
+
+def is_partitioned(connection):
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_p{month:%Y_%m}"
+
+
+def _bound(month):
+    return datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc).isoformat()
+
+
+def _insert_columns(cursor, table):
+    """Quoted columns of ``table`` that can be inserted into (not generated)."""
+    cursor.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = %s AND is_generated = 'NEVER' "
+        "ORDER BY ordinal_position",
+        [table],
+    )
+    return [name for name, in cursor.fetchall()]
+
+
+def _table_exists(cursor, table):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [table])
+    return cursor.fetchone()[0]
+
+
+def create_month_partition(connection, month):
+    """Create the partition holding ``month`` if it does not exist yet.
+
+    Rows for that month may already sit in the DEFAULT partition, and
+    Postgres refuses a new partition whose range the DEFAULT one still
+    holds. The DEFAULT partition is then detached, the month created, its
+    rows moved over and the DEFAULT partition attached again. Call this
+    inside a transaction.
+    """
+    month = month.replace(day=1)
+    qn = connection.ops.quote_name
+    lower, upper = _bound(month), _bound(add_months(month, 1))
+    name = partition_name(month)
+    with connection.cursor() as cursor:
+        if _table_exists(cursor, name):
+            return
+        stranded = False
+        if _table_exists(cursor, DEFAULT_PARTITION):
+            cursor.execute(
+                f"SELECT 1 FROM {qn(DEFAULT_PARTITION)} WHERE started_at >= %s AND started_at < %s LIMIT 1",
+                [lower, upper],
+            )
+            stranded = cursor.fetchone() is not None
+        if stranded:
+            cursor.execute(f"ALTER TABLE {qn(TABLE)} DETACH PARTITION {qn(DEFAULT_PARTITION)}")
+        cursor.execute(
+            f"CREATE TABLE {qn(name)} PARTITION OF {qn(TABLE)} "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        )
+        if stranded:
+            columns = ", ".join(qn(column) for column in _insert_columns(cursor, DEFAULT_PARTITION))
+            cursor.execute(
+                f"INSERT INTO {qn(TABLE)} ({columns}) SELECT {columns} FROM {qn(DEFAULT_PARTITION)} "
+                f"WHERE started_at >= %s AND started_at < %s",
+                [lower, upper],
+            )
+            cursor.execute(
+                f"DELETE FROM {qn(DEFAULT_PARTITION)} WHERE started_at >= %s AND started_at < %s",
+                [lower, upper],
+            )
+            cursor.execute(f"ALTER TABLE {qn(TABLE)} ATTACH PARTITION {qn(DEFAULT_PARTITION)} DEFAULT")
+
+
+def ensure_partitions(connection, start, months):
+    """Create monthly partitions from ``start`` for ``months`` months."""
+    start = start.replace(day=1)
+    for offset in range(months):
+        create_month_partition(connection, add_months(start, offset))
+
+
+def convert_to_partitioned(connection, months_ahead=3):
+    """Rebuild ``core_focussession`` as a table partitioned by ``started_at``.
+
+    Postgres requires the partition key in every unique constraint, so the
+    primary key becomes ``(id, started_at)``; ids still come from the same
+    identity sequence. Existing rows are copied over and the old table is
+    dropped. Rows outside the created months land in a default partition.
+    """
+    if connection.vendor != "postgresql" or is_partitioned(connection):
+        return False
+
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} RENAME TO {qn(LEGACY_TABLE)}")
+        cursor.execute(f"ALTER INDEX IF EXISTS {qn(TABLE + '_pkey')} RENAME TO {qn(LEGACY_TABLE + '_pkey')}")
+
+        # Secondary indexes and foreign keys move over under their own names.
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = %s AND indexname <> %s",
+            [LEGACY_TABLE, LEGACY_TABLE + "_pkey"],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [LEGACY_TABLE],
+        )
+        foreign_keys = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {qn(name)}")
+
+        cursor.execute(
+            f"CREATE TABLE {qn(TABLE)} (LIKE {qn(LEGACY_TABLE)} "
+            f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING IDENTITY INCLUDING GENERATED) "
+            f"PARTITION BY RANGE (started_at)"
+        )
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} ADD PRIMARY KEY (id, started_at)")
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(name)} {definition}")
+        for name, definition in indexes:
+            # A unique index can't span partitions without the partition key,
+            # so unique indexes come back as plain ones.
+            definition = re.sub(r" ON (ONLY )?\S+ ", f" ON {qn(TABLE)} ", definition, count=1)
+            cursor.execute(definition.replace("CREATE UNIQUE INDEX", "CREATE INDEX", 1))
+        cursor.execute(f"CREATE TABLE {qn(DEFAULT_PARTITION)} PARTITION OF {qn(TABLE)} DEFAULT")
+
+        cursor.execute(f"SELECT MIN(started_at) FROM {qn(LEGACY_TABLE)}")
+        oldest = cursor.fetchone()[0]
+        today = date.today().replace(day=1)
+        first = oldest.date().replace(day=1) if oldest else today
+        span = (today.year - first.year) * 12 + today.month - first.month + 1 + months_ahead
+        ensure_partitions(connection, first, span)
+
+        # Generated columns (duration_minutes, success) can't be inserted into.
+        columns = ", ".join(qn(name) for name in _insert_columns(cursor, LEGACY_TABLE))
+        cursor.execute(f"INSERT INTO {qn(TABLE)} ({columns}) SELECT {columns} FROM {qn(LEGACY_TABLE)}")
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {qn(TABLE)}), 0) + 1, false)",
+            [TABLE],
+        )
+        cursor.execute(f"DROP TABLE {qn(LEGACY_TABLE)}")
+    return True
@@ -0,0 +1,208 @@
+"""Query-plan regression checks for the critical read paths.
+
+Each workload in WORKLOADS makes one API call against a seeded database.
+Every SELECT it runs, apart from the database cache's, is captured and EXPLAINed. A plan is kept as its
+shape, which is the tree of node types with the tables and indexes they
+touch, plus the root's estimated cost and row count on PostgreSQL. SQLite
+only reports the shape. Baselines are JSON files per database vendor in
+core/plan_baselines/. check() reports a workload whose statement count
+changed, any plan whose shape changed, and any plan whose estimated cost
+grew by more than the tolerance.
+
+Seeding and ANALYZE happen inside a transaction that is rolled back, so
+`manage.py query_plans` leaves the database as it found it. Still, run it
+against an empty scratch database: existing rows change the estimates.
+"""
+import difflib
+import json
+import random
+import re
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models.main import Task, FocusSession, Setting
+from core.ordering import spaced_keys
+
+BASELINE_DIR = Path(__file__).resolve().parent / "plan_baselines"
+COST_TOLERANCE = 0.5
+SEED = {"users": 5, "tasks_per_user": 40, "sessions_per_task": 30, "days": 365}
+
+WORKLOADS = {
+    "task_list": ("get", "/api/tasks/"),
+    "weekly": ("get", "/api/day-summaries/weekly/?weeks=12"),
+    "monthly": ("get", "/api/day-summaries/monthly/?months=6"),
+    "day_summary_recompute": ("post", "/api/day-summaries/recompute/"),
+}
+
+TABLES = ("auth_user", "core_setting", "core_task", "core_focussession", "core_block", "core_daysummary")
+# Monthly partitions of core_focussession (core.partitions) plan as one table.
+PARTITION_SUFFIX = re.compile(r"_(p\d{4}_\d{2}|default)$")
+
+
+def baseline_path(vendor=None):
+    return BASELINE_DIR / f"{vendor or connection.vendor}.json"
+
+
+def seed(users, tasks_per_user, sessions_per_task, days):
+    """Deterministic users, tasks and focus history; returns the first user."""
+    rng = random.Random(0)
+    now = timezone.now()
+    User = get_user_model()
+    first = None
+    for n in range(users):
+        user = User.objects.create_user(username=f"plan-{n}")
+        first = first or user
+        Setting.objects.create(user=user)
+        positions = spaced_keys(tasks_per_user)
+        tasks = Task.objects.bulk_create([
+            Task(user=user, title=f"Task {i}", status=rng.choice(Task.Status.values), position=positions[i])
+            for i in range(tasks_per_user)
+        ])
+        sessions = []
+        for task in tasks:
+            for _ in range(sessions_per_task):
+                started = now - timedelta(days=rng.randrange(days), minutes=rng.randrange(1440))
+                sessions.append(FocusSession(
+                    task=task,
+                    user=user,
+                    started_at=started,
+                    ended_at=started + timedelta(minutes=rng.randrange(1, 60)),
+                ))
+        FocusSession.objects.bulk_create(sessions, batch_size=1000)
+    return first
+
+
+def analyze():
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("ANALYZE " + ", ".join(connection.ops.quote_name(table) for table in TABLES))
+        else:
+            cursor.execute("ANALYZE")
+
+
+def _postgres_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]["Plan"]
+    shape = []
+
+    def walk(node, depth):
+        line = node["Node Type"]
+        if "Relation Name" in node:
+            line += " on " + PARTITION_SUFFIX.sub("", node["Relation Name"])
+        if "Index Name" in node:
+            line += " using " + PARTITION_SUFFIX.sub("", node["Index Name"])
+        shape.append("  " * depth + line)
+        for child in node.get("Plans", ()):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return {"shape": shape, "cost": root["Total Cost"], "rows": root["Plan Rows"]}
+
+
+def _sqlite_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        rows = cursor.fetchall()
+    depth = {0: -1}
+    shape = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        shape.append("  " * depth[node_id] + detail)
+    return {"shape": shape, "cost": None, "rows": None}
+
+
+def explain(sql):
+    if connection.vendor == "postgresql":
+        return _postgres_plan(sql)
+    if connection.vendor == "sqlite":
+        return _sqlite_plan(sql)
+    raise NotImplementedError(f"No plan capture for {connection.vendor}")
+
+
+def capture(user):
+    """{workload: [plan per SELECT it ran]} for `user`."""
+    client = APIClient()
+    client.force_authenticate(user)
+    plans = {}
+    with override_settings(ALLOWED_HOSTS=["*"], THROTTLE_BUCKET_CAPACITY=0):
+        for name, (method, path) in WORKLOADS.items():
+            with CaptureQueriesContext(connection) as ctx:
+                resp = getattr(client, method)(path)
+            if resp.status_code >= 400:
+                raise RuntimeError(f"{name}: {method.upper()} {path} returned {resp.status_code}")
+            plans[name] = [
+                explain(query["sql"]) for query in ctx.captured_queries
+                if query["sql"].startswith("SELECT") and settings.CACHE_TABLE not in query["sql"]
+            ]
+    return plans
+
+
+@contextmanager
+def _rolled_back():
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def collect(seed_options=None):
+    """Seed, analyze and capture plans, leaving the database unchanged."""
+    seed_options = {**SEED, **(seed_options or {})}
+    with _rolled_back():
+        user = seed(**seed_options)
+        analyze()
+        return {"vendor": connection.vendor, "seed": seed_options, "plans": capture(user)}
+
+
+def compare(baseline, current, tolerance=COST_TOLERANCE):
+    """Readable descriptions of regressions of `current` against `baseline`."""
+    problems = []
+    for name, old_plans in baseline["plans"].items():
+        new_plans = current["plans"].get(name)
+        if new_plans is None:
+            problems.append(f"{name}: workload no longer captured")
+            continue
+        if len(new_plans) != len(old_plans):
+            problems.append(f"{name}: {len(old_plans)} statement(s) in the baseline, now {len(new_plans)}")
+            continue
+        for n, (old, new) in enumerate(zip(old_plans, new_plans), 1):
+            if old["shape"] != new["shape"]:
+                diff = "\n".join(difflib.unified_diff(old["shape"], new["shape"], "baseline", "current", lineterm=""))
+                problems.append(f"{name} statement {n}: plan changed\n{diff}")
+            elif old["cost"] and new["cost"] and new["cost"] > old["cost"] * (1 + tolerance):
+                problems.append(
+                    f"{name} statement {n}: estimated cost {old['cost']:.1f} -> {new['cost']:.1f}, "
+                    f"rows {old['rows']} -> {new['rows']}"
+                )
+    return problems
+
+
+def load_baseline(vendor=None):
+    path = baseline_path(vendor)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def write_baseline(plans):
+    BASELINE_DIR.mkdir(exist_ok=True)
+    baseline_path(plans["vendor"]).write_text(json.dumps(plans, indent=2, sort_keys=True) + "\n")
+
+
+def check(tolerance=COST_TOLERANCE):
+    """Regressions against this vendor's baseline; raises FileNotFoundError without one."""
+    baseline = load_baseline()
+    if baseline is None:
+        raise FileNotFoundError(f"No query plan baseline at {baseline_path()}")
+    return compare(baseline, collect(baseline["seed"]), tolerance)
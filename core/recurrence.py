@@ -0,0 +1,122 @@
+"""Lazy expansion of recurring Blocks into occurrences.
+
+A recurring Block is stored once. Its start_date/end_date describe the first
+occurrence; later ones keep the same local wall-clock time and duration.
+Wall-clock times are the owner's, in their Setting.timezone, so an
+occurrence keeps its local time across DST changes. Rules are a small
+RRULE subset: DAILY or WEEKLY (optionally on several
+weekdays), every `recurrence_interval` days/weeks, ending at
+`recurrence_until` (inclusive) or after `recurrence_count` occurrences.
+Per-occurrence changes live in BlockException rows keyed by the original
+start.
+"""
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from core.models.main import Block, Setting
+
+MAX_RECURRENCE_COUNT = 1000
+
+
+def _days(block, first_day, since_day):
+    """Dates of the rule's occurrences in order, from `first_day` on.
+
+    Without a count, whole periods before `since_day` are skipped
+    arithmetically so long-running rules cost no more than short ones.
+    """
+    step = block.recurrence_interval or 1
+    skip = since_day is not None and block.recurrence_count is None and since_day > first_day
+    if block.recurrence == Block.Recurrence.DAILY:
+        k = (since_day - first_day).days // step if skip else 0
+        while True:
+            yield first_day + timedelta(days=k * step)
+            k += 1
+
+    weekdays = sorted(set(block.recurrence_weekdays)) or [first_day.weekday()]
+    week0 = first_day - timedelta(days=first_day.weekday())
+    k = (since_day - week0).days // 7 // step if skip else 0
+    while True:
+        monday = week0 + timedelta(weeks=k * step)
+        for weekday in weekdays:
+            day = monday + timedelta(days=weekday)
+            if day >= first_day:
+                yield day
+        k += 1
+
+
+def owner_zone(block):
+    """The time zone the block's owner plans in."""
+    return Setting.day_clock(block.task.user_id).tz
+
+
+def rule_starts(block, since, until, tz=None):
+    """Original occurrence starts of `block` from about `since` up to, not including, `until`.
+
+    `tz` defaults to owner_zone(block); pass it when expanding many blocks.
+    """
+    if not block.recurrence:
+        if block.start_date < until:
+            yield block.start_date
+        return
+
+    tz = tz or owner_zone(block)
+    first = timezone.localtime(block.start_date, tz)
+    since_day = timezone.localtime(since, tz).date() if since is not None else None
+    for n, day in enumerate(_days(block, first.date(), since_day)):
+        if block.recurrence_count is not None and n >= block.recurrence_count:
+            return
+        start = timezone.make_aware(datetime.combine(day, first.time()), tz)
+        if start >= until or (block.recurrence_until is not None and start > block.recurrence_until):
+            return
+        if since is None or start >= since:
+            yield start
+
+
+def is_occurrence(block, moment, tz=None):
+    return moment in rule_starts(block, moment, moment + timedelta(microseconds=1), tz)
+
+
+def _occurrence(block, start, duration, exception):
+    occurrence = {
+        "occurrence_start": start,
+        "start_date": start,
+        "end_date": start + duration,
+        "done": block.done,
+    }
+    if exception is not None:
+        if exception.cancelled:
+            return None
+        occurrence["done"] = exception.done
+        if exception.start_date is not None:
+            occurrence["start_date"] = exception.start_date
+            occurrence["end_date"] = exception.start_date + duration
+        if exception.end_date is not None:
+            occurrence["end_date"] = exception.end_date
+    return occurrence
+
+
+def expand(block, window_start, window_end, exceptions=(), tz=None):
+    """Occurrences of `block` overlapping [window_start, window_end), with exceptions applied.
+
+    Returns dicts with occurrence_start, start_date, end_date and done, in
+    original order; occurrences moved into the window come last.
+    """
+    duration = block.end_date - block.start_date
+    if block.recurrence:
+        tz = tz or owner_zone(block)
+    pending = {exception.occurrence_start: exception for exception in exceptions}
+    occurrences = []
+
+    def add(occurrence):
+        if occurrence and occurrence["start_date"] < window_end and occurrence["end_date"] > window_start:
+            occurrences.append(occurrence)
+
+    for start in rule_starts(block, window_start - duration, window_end, tz):
+        add(_occurrence(block, start, duration, pending.pop(start, None)))
+    # Occurrences from outside the window that were moved into it. Skip
+    # exceptions the rule no longer produces (it was edited since).
+    for start, exception in pending.items():
+        if exception.start_date is not None and is_occurrence(block, start, tz):
+            add(_occurrence(block, start, duration, exception))
+    return occurrences
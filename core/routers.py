@@ -0,0 +1,103 @@
+"""Send reads of safe API requests to an optional read replica.
+
+Views opt in through core.views.main.ReplicaReadMixin, which opens a replica
+scope for GET/HEAD/OPTIONS once the user is authenticated. Everything else,
+including reads outside a scope, stays on `default`. A scope falls back to
+`default` for the rest of the request as soon as anything writes, and a user
+who just wrote is pinned to `default` for REPLICA_STICKY_SECONDS so they
+read their own changes while the replica catches up. The pin is kept in the
+shared cache and also handed to the client as a signed cookie, so it holds
+whichever worker serves the next request. Without DATABASE_REPLICA_URL the
+router never picks the replica.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_PIN_KEY = "replica-pin:{}"
+REPLICA_PIN_COOKIE = "read_primary"
+REPLICA_PIN_SALT = "core.routers.pin"
+# DatabaseCache's stand-in model; cache entries always use the primary.
+CACHE_APP_LABEL = "django_cache"
+
+_scope = ContextVar("replica_scope", default=None)
+
+
+def replica_alias():
+    return getattr(settings, "REPLICA_DATABASE", None)
+
+
+def pin_primary(user_id, response=None):
+    """Keep this user's reads on the primary for a short while after a write.
+
+    With a `response`, the pin also goes out as a cookie.
+    """
+    seconds = settings.REPLICA_STICKY_SECONDS
+    if replica_alias() and seconds > 0:
+        cache.set(REPLICA_PIN_KEY.format(user_id), True, seconds)
+        if response is not None:
+            response.set_signed_cookie(
+                REPLICA_PIN_COOKIE, str(user_id), salt=REPLICA_PIN_SALT,
+                max_age=seconds, httponly=True, samesite="Lax", secure=not settings.DEBUG,
+            )
+
+
+def is_pinned(user_id, request=None):
+    if request is not None:
+        pinned = request.get_signed_cookie(
+            REPLICA_PIN_COOKIE, default=None, salt=REPLICA_PIN_SALT, max_age=settings.REPLICA_STICKY_SECONDS,
+        )
+        if pinned == str(user_id):
+            return True
+    return bool(cache.get(REPLICA_PIN_KEY.format(user_id)))
+
+
+def open_scope():
+    """Start routing reads to the replica; pass the token to close_scope()."""
+    return _scope.set({"wrote": False})
+
+
+def close_scope(token):
+    _scope.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    token = open_scope()
+    try:
+        yield
+    finally:
+        close_scope(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == CACHE_APP_LABEL:
+            return DEFAULT_DB_ALIAS
+        scope = _scope.get()
+        alias = replica_alias()
+        if alias and scope is not None and not scope["wrote"]:
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        scope = _scope.get()
+        # A cache write (a dashboard section, a pin) is not a change to the user's data.
+        if scope is not None and model._meta.app_label != CACHE_APP_LABEL:
+            scope["wrote"] = True
+        # Explicit, so instances loaded from the replica save to the primary.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if replica_alias() and db == replica_alias():
+            return False
+        return None
@@ -0,0 +1,166 @@
+"""Read-only list rendering straight from `.values()` rows.
+
+The ModelSerializers in core.serializers.main build field objects and run
+`to_representation` per field and per row, and TaskSerializer runs one SUM
+query per task. The classes here fetch plain rows and map each column with a
+function compiled once per call. Output is identical to the ModelSerializers
+(see core.tests); keep the field lists in sync when those change.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.settings import api_settings, ISO_8601
+
+from core.serializers.main import omit_default_colors
+
+DATETIME = "datetime"
+
+
+def _datetime_mapper():
+    """Equivalent of DRF's DateTimeField.to_representation for ISO 8601 output."""
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def to_representation(value):
+        if not value:
+            return None
+        if tz is not None:
+            value = value.astimezone(tz)
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return to_representation
+
+
+class RowSerializer:
+    """Render `queryset.values()` rows. `fields` holds (key, column, kind) triples."""
+    fields = ()
+
+    def __init__(self, queryset):
+        # values() rows don't need the prefetches the ModelSerializers rely on.
+        self.queryset = queryset.prefetch_related(None)
+
+    @classmethod
+    def is_supported(cls):
+        return (api_settings.DATETIME_FORMAT or "").lower() == ISO_8601
+
+    @classmethod
+    def columns(cls):
+        return [column for _, column, _ in cls.fields]
+
+    @classmethod
+    def compile(cls):
+        mappers = {DATETIME: _datetime_mapper()}
+        return [(key, column, mappers.get(kind)) for key, column, kind in cls.fields]
+
+    @classmethod
+    def map_rows(cls, rows):
+        fields = cls.compile()
+        return [
+            {key: (mapper(row[column]) if mapper else row[column]) for key, column, mapper in fields}
+            for row in rows
+        ]
+
+    @property
+    def data(self):
+        return self.map_rows(self.queryset.values(*self.columns()))
+
+
+class FocusSessionRowSerializer(RowSerializer):
+    fields = (
+        ("id", "id", None),
+        ("task", "task_id", None),
+        ("started_at", "started_at", DATETIME),
+        ("ended_at", "ended_at", DATETIME),
+        ("duration_minutes", "duration_minutes", None),
+        ("success", "success", None),
+        ("notes", "notes", None),
+    )
+
+
+class BlockRowSerializer(RowSerializer):
+    fields = (
+        ("id", "id", None),
+        ("task", "task_id", None),
+        ("title", "title", None),
+        ("desc", "desc", None),
+        ("done", "done", None),
+        ("start_date", "start_date", DATETIME),
+        ("end_date", "end_date", DATETIME),
+        ("recurrence", "recurrence", None),
+        ("recurrence_interval", "recurrence_interval", None),
+        ("recurrence_weekdays", "recurrence_weekdays", None),
+        ("recurrence_until", "recurrence_until", DATETIME),
+        ("recurrence_count", "recurrence_count", None),
+    )
+
+
+class TaskRowSerializer(RowSerializer):
+    """TaskSerializer output with sessions and blocks fetched in one query each."""
+    def __init__(self, queryset, omit_default_colors=False):
+        super().__init__(queryset)
+        self.omit_default_colors = omit_default_colors
+
+    fields = (
+        ("id", "id", None),
+        ("title", "title", None),
+        ("description", "description", None),
+        ("status", "status", None),
+        ("estimated_minutes", "estimated_minutes", None),
+        ("background_color", "background_color", None),
+        ("theme_color", "theme_color", None),
+        ("color", "color", None),
+        ("position", "position", None),
+        ("created_at", "created_at", DATETIME),
+        ("updated_at", "updated_at", DATETIME),
+    )
+
+    def _children(self, related_name, serializer_class, task_ids):
+        model = self.queryset.model._meta.get_field(related_name).related_model
+        rows = (
+            model.objects.filter(task_id__in=task_ids)
+            .order_by("id")
+            .values(*serializer_class.columns())
+        )
+        grouped = defaultdict(list)
+        for item in serializer_class.map_rows(rows):
+            grouped[item["task"]].append(item)
+        return grouped
+
+    @property
+    def data(self):
+        tasks = self.map_rows(self.queryset.values(*self.columns()))
+        if not tasks:
+            return []
+
+        task_ids = self.queryset.values("id")
+        sessions = self._children("focus_sessions", FocusSessionRowSerializer, task_ids)
+        blocks = self._children("blocks", BlockRowSerializer, task_ids)
+
+        data = []
+        for task in tasks:
+            task_sessions = sessions.get(task["id"], [])
+            focused = sum(item["duration_minutes"] for item in task_sessions)
+            estimated = task["estimated_minutes"]
+            data.append({
+                "id": task["id"],
+                "title": task["title"],
+                "description": task["description"],
+                "status": task["status"],
+                "progress": min(100, int((focused / estimated) * 100)) if estimated else 0,
+                "estimated_minutes": estimated,
+                "background_color": task["background_color"],
+                "theme_color": task["theme_color"],
+                "color": task["color"],
+                "position": task["position"],
+                "created_at": task["created_at"],
+                "updated_at": task["updated_at"],
+                "focus_sessions": task_sessions,
+                "blocks": blocks.get(task["id"], []),
+                "total_focused_minutes": focused,
+            })
+            if self.omit_default_colors:
+                omit_default_colors(data[-1])
+        return data
@@ -1,5 +1,18 @@
-from rest_framework import serializers
-from core.models.main import Task, FocusSession, DaySummary, Block, Setting, Note
+from rest_framework import exceptions, serializers, status
+from core.models.main import (
+    Task,
+    FocusSession,
+    DaySummary,
+    Block,
+    BlockException,
+    Setting,
+    Note,
+    DeletionJob,
+    ArchivedTask,
+    ArchivedFocusSession,
+    ArchivedBlock,
+)
+from core.recurrence import MAX_RECURRENCE_COUNT, is_occurrence
 
 class FocusSessionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -39,6 +52,23 @@ class BlockSerializer(serializers.ModelSerializer):
                 "end_date": "end_date must be greater than or equal to start_date"
             })
 
+        def current(name):
+            return attrs.get(name, getattr(self.instance, name, None))
+
+        if current("recurrence_count") is not None and current("recurrence_until") is not None:
+            raise serializers.ValidationError({
+                "recurrence_count": "Set either recurrence_count or recurrence_until, not both"
+            })
+        if (current("recurrence_count") or 0) > MAX_RECURRENCE_COUNT:
+            raise serializers.ValidationError({
+                "recurrence_count": f"recurrence_count must be at most {MAX_RECURRENCE_COUNT}"
+            })
+        if (current("recurrence_interval") or 1) < 1:
+            raise serializers.ValidationError({"recurrence_interval": "recurrence_interval must be at least 1"})
+        weekdays = current("recurrence_weekdays") or []
+        if not isinstance(weekdays, list) or any(day not in range(7) for day in weekdays):
+            raise serializers.ValidationError({"recurrence_weekdays": "Use a list of weekdays, 0 (Monday) to 6"})
+
         return attrs
 
     class Meta:
@@ -51,10 +81,60 @@ class BlockSerializer(serializers.ModelSerializer):
             "done",
             "start_date",
             "end_date",
+            "recurrence",
+            "recurrence_interval",
+            "recurrence_weekdays",
+            "recurrence_until",
+            "recurrence_count",
         ]
         read_only_fields = ["title", "desc"]
 
+
+class BlockExceptionSerializer(serializers.ModelSerializer):
+    """Per-occurrence override; `block` comes from the URL."""
+
+    def validate(self, attrs):
+        block = self.context["block"]
+        if not block.recurrence:
+            raise serializers.ValidationError("Only recurring blocks have occurrences to override")
+        if not is_occurrence(block, attrs["occurrence_start"]):
+            raise serializers.ValidationError({"occurrence_start": "Not an occurrence of this block"})
+        start_date, end_date = attrs.get("start_date"), attrs.get("end_date")
+        if start_date and not end_date:
+            # Moving only the start keeps the block's duration.
+            end_date = attrs["end_date"] = start_date + (block.end_date - block.start_date)
+        if end_date and end_date < (start_date or attrs["occurrence_start"]):
+            raise serializers.ValidationError({
+                "end_date": "end_date must be greater than or equal to start_date"
+            })
+        return attrs
+
+    class Meta:
+        model = BlockException
+        fields = [
+            "id",
+            "block",
+            "occurrence_start",
+            "cancelled",
+            "done",
+            "start_date",
+            "end_date",
+        ]
+        read_only_fields = ["block"]
+
+TASK_COLOR_FIELDS = ("background_color", "theme_color", "color")
+
+
+def omit_default_colors(data):
+    """Drop task color fields that still hold their model default."""
+    for name in TASK_COLOR_FIELDS:
+        if data.get(name) == Task._meta.get_field(name).default:
+            del data[name]
+    return data
+
+
 class TaskSerializer(serializers.ModelSerializer):
+    """Pass `omit_default_colors=True` in the context to leave out default colors."""
     focus_sessions = FocusSessionSerializer(many=True, read_only=True)
     blocks = serializers.SerializerMethodField()
 
@@ -75,8 +155,13 @@ class TaskSerializer(serializers.ModelSerializer):
         qs = getattr(obj, "blocks", None)
         if qs is None:
             return []
-        from .main import BlockSerializer as _BlockSerializer  
-        return _BlockSerializer(qs.all(), many=True).data
+        return BlockSerializer(qs.all(), many=True).data
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if self.context.get("omit_default_colors"):
+            omit_default_colors(data)
+        return data
 
     class Meta:
         model = Task
@@ -90,12 +175,15 @@ class TaskSerializer(serializers.ModelSerializer):
             "background_color",
             "theme_color",
             "color",
+            "position",
             "created_at",
             "updated_at",
             "focus_sessions",
             "blocks",
             "total_focused_minutes",
         ]
+        # Changed through /tasks/{id}/move/ only.
+        read_only_fields = ["position"]
 
 
 class SettingSerializer(serializers.ModelSerializer):
@@ -105,21 +193,147 @@ class SettingSerializer(serializers.ModelSerializer):
             "id",
             "day_bounds",
             "column_colors",
+            "timezone",
             "created_at",
             "updated_at",
         ]
         read_only_fields = ["created_at", "updated_at"]
 
 
+class NoteConflict(exceptions.APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The note changed since base_hash; fetch it again."
+    default_code = "conflict"
+
+
+class NoteEditSerializer(serializers.Serializer):
+    """Replace `delete` characters at `offset` with `insert`."""
+    offset = serializers.IntegerField(min_value=0)
+    # Not defaults: PATCH makes nested fields partial, which skips defaults.
+    delete = serializers.IntegerField(min_value=0, required=False)
+    insert = serializers.CharField(allow_blank=True, trim_whitespace=False, required=False)
+
+
+def apply_content_patch(text, edits):
+    """Apply edits made against `text`.
+
+    Offsets count Unicode code points of the original text; edits must be in
+    ascending order and must not overlap.
+    """
+    pieces = []
+    cursor = 0
+    for edit in edits:
+        start = edit["offset"]
+        end = start + edit.get("delete", 0)
+        if start < cursor or end > len(text):
+            raise serializers.ValidationError({
+                "content_patch": "Edits must be ordered, non-overlapping and inside the note."
+            })
+        pieces.append(text[cursor:start])
+        pieces.append(edit.get("insert", ""))
+        cursor = end
+    pieces.append(text[cursor:])
+    return "".join(pieces)
+
+
 class NoteSerializer(serializers.ModelSerializer):
+    """Full note. Updates may send `content_patch` edits and the `base_hash`
+    they were made against instead of the whole `content`."""
+    content_patch = NoteEditSerializer(many=True, write_only=True, required=False)
+    base_hash = serializers.CharField(write_only=True, required=False)
+
+    def validate(self, attrs):
+        edits = attrs.pop("content_patch", None)
+        base_hash = attrs.pop("base_hash", None)
+        if edits is None:
+            return attrs
+        if self.instance is None:
+            raise serializers.ValidationError({"content_patch": "Only existing notes can be patched."})
+        if "content" in attrs:
+            raise serializers.ValidationError({"content_patch": "Send either content or content_patch."})
+        if base_hash != self.instance.content_hash:
+            raise NoteConflict()
+        attrs["content"] = apply_content_patch(self.instance.content, edits)
+        self.patched = True
+        return attrs
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if getattr(self, "patched", False):
+            # The client already holds the result; content_hash confirms it.
+            del data["content"]
+        return data
+
     class Meta:
         model = Note
         fields = [
             "id",
             "title",
             "content",
+            "content_hash",
+            "content_size",
             "background_color",
             "created_at",
             "updated_at",
+            "content_patch",
+            "base_hash",
         ]
         read_only_fields = ["created_at", "updated_at"]
+
+
+class NoteListSerializer(serializers.ModelSerializer):
+    """List shape: an excerpt and hash instead of the body, which only detail GETs return."""
+    class Meta:
+        model = Note
+        fields = [
+            "id",
+            "title",
+            "excerpt",
+            "content_hash",
+            "content_size",
+            "background_color",
+            "created_at",
+            "updated_at",
+        ]
+
+
+class DeletionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DeletionJob
+        fields = [
+            "id",
+            "kind",
+            "target_id",
+            "status",
+            "rows_deleted",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class ArchivedFocusSessionSerializer(FocusSessionSerializer):
+    class Meta(FocusSessionSerializer.Meta):
+        model = ArchivedFocusSession
+        read_only_fields = FocusSessionSerializer.Meta.fields
+
+
+class ArchivedBlockSerializer(BlockSerializer):
+    class Meta(BlockSerializer.Meta):
+        model = ArchivedBlock
+        read_only_fields = BlockSerializer.Meta.fields
+
+
+class ArchivedTaskSerializer(TaskSerializer):
+    """Same shape as TaskSerializer plus `archived_at`, read only."""
+    focus_sessions = ArchivedFocusSessionSerializer(many=True, read_only=True)
+
+    def get_blocks(self, obj):
+        return ArchivedBlockSerializer(obj.blocks.all(), many=True).data
+
+    class Meta(TaskSerializer.Meta):
+        model = ArchivedTask
+        fields = TaskSerializer.Meta.fields + ["archived_at"]
+        read_only_fields = fields
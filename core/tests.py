@@ -1,11 +1,57 @@
-from datetime import timedelta
+import gzip
+import io
+import random
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import NotSupportedError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
 
-from core.models.main import Task
-from core.serializers.main import BlockSerializer
+from core import partitions
+from core.authentication import CachedJWTAuthentication
+from core.checks import check_database_vendor, check_shared_cache
+from core.deletion import run_pending
+from core.management.commands.bench_startup import import_profile
+from core.models.main import (
+	Task, FocusSession, DaySummary, Block, Setting, Note, Tombstone, DeletionJob, ArchivedTask, ArchivedBlock,
+	MinutesBetween,
+)
+from core.ordering import key_between
+from core.queryplans import check, compare, load_baseline
+from core.renderers import FastJSONRenderer
+from core.routers import REPLICA_PIN_COOKIE, ReplicaRouter, is_pinned, replica_reads
+from core.serializers.fast import TaskRowSerializer, FocusSessionRowSerializer, BlockRowSerializer
+from core.serializers.main import BlockSerializer, FocusSessionSerializer, TaskSerializer, omit_default_colors
+from core.throttling import CostThrottle
+from core.workload import DEFAULT_MIX, Distribution, Replayer, seed as seed_workload, synthetic_events
+
+
+def app_queries(ctx):
+	"""SQL captured by `ctx`, leaving out the database cache's statements and savepoints."""
+	return [
+		q["sql"] for q in ctx.captured_queries
+		if settings.CACHE_TABLE not in q["sql"] and "SAVEPOINT" not in q["sql"]
+	]
 
 
 class BlockSerializerValidationTests(TestCase):
@@ -29,3 +75,907 @@ class BlockSerializerValidationTests(TestCase):
 
 		self.assertFalse(serializer.is_valid())
 		self.assertIn("end_date", serializer.errors)
+
+
+class ArchiveTests(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.user = User.objects.create_user(username="u1", password="pw")
+		self.task = Task.objects.create(user=self.user, title="T", status=Task.Status.DONE)
+		start = timezone.now() - timedelta(hours=2)
+		FocusSession.objects.create(task=self.task, started_at=start, ended_at=start + timedelta(minutes=25))
+		Block.objects.create(task=self.task, start_date=start, end_date=start + timedelta(hours=1))
+
+	def test_archive_moves_rows_and_keeps_day_summary(self):
+		summary = DaySummary.objects.get(user=self.user)
+		self.assertEqual(summary.total_focused_minutes, 25)
+
+		ArchivedTask.archive([self.task])
+
+		self.assertFalse(Task.objects.exists())
+		self.assertFalse(FocusSession.objects.exists())
+		self.assertEqual(ArchivedTask.objects.get().id, self.task.id)
+		self.assertEqual(ArchivedBlock.objects.count(), 1)
+
+		summary.recompute()
+		self.assertEqual(summary.total_focused_minutes, 25)
+
+	def test_include_archived_flag(self):
+		ArchivedTask.archive([self.task])
+		client = APIClient()
+		client.force_authenticate(self.user)
+
+		self.assertEqual(client.get("/api/tasks/").json(), [])
+		data = client.get("/api/tasks/?include_archived=1").json()
+		self.assertEqual([t["id"] for t in data], [self.task.id])
+		self.assertEqual(data[0]["total_focused_minutes"], 25)
+		self.assertEqual(len(data[0]["blocks"]), 1)
+
+
+class PartitionHelperTests(TestCase):
+	def test_add_months_crosses_year_ends(self):
+		self.assertEqual(partitions.add_months(date(2025, 11, 1), 2), date(2026, 1, 1))
+		self.assertEqual(partitions.add_months(date(2025, 12, 1), 1), date(2026, 1, 1))
+		self.assertEqual(partitions.add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+		self.assertEqual(partitions.add_months(date(2026, 3, 1), -15), date(2024, 12, 1))
+		self.assertEqual(partitions.add_months(date(2026, 3, 1), 0), date(2026, 3, 1))
+
+	def test_partition_name(self):
+		self.assertEqual(partitions.partition_name(date(2026, 1, 1)), "core_focussession_p2026_01")
+		self.assertEqual(partitions.partition_name(date(2025, 12, 1)), "core_focussession_p2025_12")
+
+	def test_is_enabled_only_on_postgres(self):
+		with override_settings(FOCUS_SESSION_PARTITIONING=True):
+			self.assertEqual(partitions.is_enabled(connection), connection.vendor == "postgresql")
+		with override_settings(FOCUS_SESSION_PARTITIONING=False):
+			self.assertFalse(partitions.is_enabled(connection))
+
+	@override_settings(FOCUS_SESSION_PARTITIONING=True)
+	def test_command_moves_rows_out_of_the_default_partition(self):
+		if connection.vendor != "postgresql":
+			self.skipTest("Partitioning needs PostgreSQL")
+		call_command("focus_partitions", "--convert", "--months", "0", stdout=io.StringIO())
+		later = partitions.add_months(timezone.now().date().replace(day=1), 2)
+		user = get_user_model().objects.create_user(username="p1")
+		started = timezone.make_aware(timezone.datetime(later.year, later.month, 3, 9, 0))
+		session = FocusSession.objects.create(task=Task.objects.create(user=user, title="T"), started_at=started, ended_at=started + timedelta(minutes=25))
+
+		def rows(table):
+			with connection.cursor() as cursor:
+				cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+				return cursor.fetchone()[0]
+
+		self.assertEqual(rows(partitions.DEFAULT_PARTITION), 1)
+		call_command("focus_partitions", "--months", "3", stdout=io.StringIO())
+		self.assertEqual(rows(partitions.DEFAULT_PARTITION), 0)
+		self.assertEqual(rows(partitions.partition_name(later)), 1)
+		self.assertEqual(FocusSession.objects.get().duration_minutes, 25)
+		self.assertEqual(FocusSession.objects.get().pk, session.pk)
+
+	def test_command_is_a_no_op_off_postgres(self):
+		if connection.vendor == "postgresql":
+			self.skipTest("Partitions are created on PostgreSQL")
+		out = io.StringIO()
+		call_command("focus_partitions", "--convert", stdout=out)
+		self.assertIn("nothing to do", out.getvalue())
+		self.assertFalse(partitions.is_partitioned(connection))
+		self.assertNotIn(
+			partitions.partition_name(timezone.now().date().replace(day=1)),
+			connection.introspection.table_names(),
+		)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.user = User.objects.create_user(username="u1", password="pw")
+		token = RefreshToken.for_user(self.user).access_token
+		self.request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+		self.auth = CachedJWTAuthentication()
+		cache.clear()
+
+	def test_second_request_skips_user_query(self):
+		user, _ = self.auth.authenticate(self.request)
+		self.assertEqual(user.get_deferred_fields(), set())
+
+		with CaptureQueriesContext(connection) as ctx:
+			user, _ = self.auth.authenticate(self.request)
+		self.assertEqual(app_queries(ctx), [])
+		self.assertEqual(user.pk, self.user.pk)
+		self.assertEqual(user.username, "u1")
+
+	def test_deactivation_invalidates_cache(self):
+		self.auth.authenticate(self.request)
+		self.user.is_active = False
+		self.user.save()
+
+		with self.assertRaises(AuthenticationFailed):
+			self.auth.authenticate(self.request)
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000, PASSWORD_SCRYPT_WORK_FACTOR=2**10)
+class PasswordRehashTests(TestCase):
+	def test_login_rehashes_to_preferred_hasher(self):
+		User = get_user_model()
+		user = User.objects.create_user(username="u1", password="pw")
+		self.assertTrue(user.password.startswith("pbkdf2_sha256$1000$"))
+
+		with override_settings(PASSWORD_HASHERS=[
+			"core.hashers.TunedScryptPasswordHasher",
+			"core.hashers.TunedPBKDF2PasswordHasher",
+		]):
+			self.assertIsNotNone(authenticate(username="u1", password="pw"))
+			user.refresh_from_db()
+			self.assertTrue(user.password.startswith("scrypt$1024$"))
+			self.assertIsNotNone(authenticate(username="u1", password="pw"))
+
+	def test_hashing_runs_on_the_pool(self):
+		user = get_user_model().objects.create_user(username="u1", password="correct horse")
+		threads = []
+		verify = PBKDF2PasswordHasher.verify
+
+		def recording_verify(hasher, password, encoded):
+			threads.append(threading.current_thread().name)
+			return verify(hasher, password, encoded)
+
+		with mock.patch.object(PBKDF2PasswordHasher, "verify", recording_verify):
+			resp = APIClient().post("/api/auth/login/", {"username": "u1", "password": "correct horse"}, format="json")
+			self.assertEqual(resp.status_code, 200)
+			with override_settings(PASSWORD_HASH_WORKERS=0):
+				self.assertTrue(user.check_password("correct horse"))
+		self.assertTrue(threads[0].startswith("password-hash"))
+		self.assertEqual(threads[1], threading.current_thread().name)
+
+
+class ThrottleAndBoundsTests(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.user = User.objects.create_user(username="u1", password="pw")
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+		cache.clear()
+
+	def test_weeks_upper_bound(self):
+		resp = self.client.get("/api/day-summaries/weekly/?weeks=10000")
+		self.assertEqual(resp.status_code, 400)
+		self.assertIn("weeks", resp.json())
+
+	@override_settings(THROTTLE_BUCKET_CAPACITY=10, THROTTLE_REFILL_PER_SECOND=0.01)
+	def test_aggregations_spend_more_tokens(self):
+		self.assertEqual(self.client.get("/api/day-summaries/weekly/").status_code, 200)
+		self.assertEqual(self.client.get("/api/day-summaries/weekly/").status_code, 200)
+		resp = self.client.get("/api/day-summaries/weekly/")
+		self.assertEqual(resp.status_code, 429)
+		self.assertIn("Retry-After", resp.headers)
+
+	@override_settings(THROTTLE_BUCKET_CAPACITY=8, THROTTLE_REFILL_PER_SECOND=0.001)
+	def test_concurrent_debits_spend_each_token_once(self):
+		class SlowCache(LocMemCache):
+			# Widen the gap between reading and writing the bucket.
+			def get(self, *args, **kwargs):
+				value = super().get(*args, **kwargs)
+				time.sleep(0.005)
+				return value
+
+		throttle_class = type("Throttle", (CostThrottle,), {"cache": SlowCache("throttle-test", {})})
+		request = SimpleNamespace(user=self.user, method="GET")
+		start = threading.Barrier(16)
+		allowed = []
+
+		def hit():
+			start.wait()
+			allowed.append(throttle_class().allow_request(request, SimpleNamespace()))
+
+		threads = [threading.Thread(target=hit) for _ in range(16)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		self.assertEqual(allowed.count(True), 8)
+
+
+class FastJSONRendererTests(TestCase):
+	def test_matches_stdlib_renderer(self):
+		data = {
+			"when": timezone.now(),
+			"amount": Decimal("1.50"),
+			"uid": uuid.uuid4(),
+			"text": "line sep \u2028 \u00fc",
+			"items": [1, None, True],
+		}
+		self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class RowSerializerParityTests(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.user = User.objects.create_user(username="u1", password="pw")
+		start = timezone.now() - timedelta(hours=3)
+		for n, estimated in enumerate((0, 30, 600)):
+			task = Task.objects.create(user=self.user, title=f"T{n}", estimated_minutes=estimated)
+			for m in range(n):
+				FocusSession.objects.create(
+					task=task,
+					started_at=start + timedelta(minutes=40 * m),
+					ended_at=start + timedelta(minutes=40 * m + 25) if (n, m) != (2, 0) else None,
+					notes="n",
+				)
+			Block.objects.create(task=task, start_date=start, end_date=start + timedelta(minutes=30))
+		self.tasks = Task.objects.filter(user=self.user).prefetch_related("focus_sessions", "blocks").order_by("-created_at")
+
+	def assertSameJSON(self, fast, slow):
+		renderer = JSONRenderer()
+		self.assertEqual(renderer.render(fast), renderer.render(slow))
+
+	def test_task_rows_match_task_serializer(self):
+		self.assertSameJSON(TaskRowSerializer(self.tasks).data, TaskSerializer(self.tasks, many=True).data)
+
+	def test_session_and_block_rows_match(self):
+		sessions = FocusSession.objects.order_by("-started_at")
+		blocks = Block.objects.order_by("-start_date")
+		self.assertSameJSON(FocusSessionRowSerializer(sessions).data, FocusSessionSerializer(sessions, many=True).data)
+		self.assertSameJSON(BlockRowSerializer(blocks).data, BlockSerializer(blocks, many=True).data)
+
+
+class SyncTests(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.user = User.objects.create_user(username="u1", password="pw")
+		self.task = Task.objects.create(user=self.user, title="T")
+		self.block = Block.objects.create(task=self.task)
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def test_full_then_delta(self):
+		first = self.client.get("/api/sync/").json()
+		self.assertTrue(first["full"])
+		self.assertEqual([b["id"] for b in first["changes"]["blocks"]], [self.block.id])
+
+		self.client.delete(f"/api/blocks/{self.block.id}/")
+		Note.objects.create(user=self.user, title="N")
+
+		delta = self.client.get("/api/sync/", {"since": first["token"]}).json()
+		self.assertFalse(delta["full"])
+		self.assertEqual(delta["deleted"]["blocks"], [self.block.id])
+		self.assertEqual([n["title"] for n in delta["changes"]["notes"]], ["N"])
+
+	def test_deleting_user_skips_tombstones(self):
+		self.user.delete()
+		self.assertFalse(Tombstone.objects.exists())
+
+
+class DaySummaryUpsertTests(TransactionTestCase):
+	@skipUnlessDBFeature("test_db_allows_multiple_connections")
+	def test_parallel_session_writes_leave_one_summary(self):
+		User = get_user_model()
+		user = User.objects.create_user(username="u1", password="pw")
+		tasks = [Task.objects.create(user=user, title=f"T{n}") for n in range(8)]
+		start = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+		barrier = threading.Barrier(len(tasks))
+		errors = []
+
+		def write(task):
+			try:
+				barrier.wait()
+				FocusSession.objects.create(task=task, started_at=start, ended_at=start + timedelta(minutes=10))
+			except Exception as exc:
+				errors.append(exc)
+			finally:
+				connection.close()
+
+		threads = [threading.Thread(target=write, args=(task,)) for task in tasks]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+
+		self.assertEqual(errors, [])
+		summaries = DaySummary.objects.filter(user=user)
+		self.assertEqual(summaries.count(), 1)
+		# The last writer may not see every other session; one more refresh must.
+		DaySummary.refresh(user.pk, summaries.get().date)
+		self.assertEqual(summaries.get().total_focused_minutes, 80)
+
+	def test_create_same_day_is_idempotent(self):
+		User = get_user_model()
+		user = User.objects.create_user(username="u1", password="pw")
+		client = APIClient()
+		client.force_authenticate(user)
+
+		first = client.post("/api/day-summaries/", {"date": "2026-01-05", "summary_text": "a"}, format="json")
+		second = client.post("/api/day-summaries/", {"date": "2026-01-05", "summary_text": "b"}, format="json")
+		self.assertEqual(first.json()["id"], second.json()["id"])
+		self.assertEqual(DaySummary.objects.get().summary_text, "b")
+
+
+class FocusActionTests(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.user = User.objects.create_user(username="u1", password="pw")
+		self.task = Task.objects.create(user=self.user, title="T")
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def test_start_end_and_single_open_session(self):
+		started = self.client.post(f"/api/tasks/{self.task.id}/start-focus/")
+		self.assertEqual(started.status_code, 201)
+		fs_id = started.json()["id"]
+
+		self.assertEqual(self.client.post(f"/api/tasks/{self.task.id}/start-focus/").status_code, 409)
+		self.assertEqual(self.client.get("/api/focus-sessions/active/").json()["id"], fs_id)
+
+		FocusSession.objects.filter(pk=fs_id).update(started_at=timezone.now() - timedelta(minutes=25, seconds=30))
+		ended = self.client.post(f"/api/tasks/{self.task.id}/end-focus/", {"focus_session_id": fs_id}, format="json")
+		self.assertEqual(ended.status_code, 200)
+		self.assertEqual(ended.json()["duration_minutes"], 25)
+		self.assertTrue(ended.json()["success"])
+		self.assertEqual(DaySummary.objects.get(user=self.user).total_focused_minutes, 25)
+
+		self.assertEqual(self.client.get("/api/focus-sessions/active/").status_code, 404)
+		self.assertEqual(self.client.post(f"/api/tasks/{self.task.id}/end-focus/", {"focus_session_id": fs_id}).status_code, 404)
+
+	def test_bulk_writes_keep_duration_and_success(self):
+		now = timezone.now()
+		FocusSession.objects.bulk_create([
+			FocusSession(task=self.task, user=self.user, started_at=now - timedelta(minutes=40), ended_at=now),
+			FocusSession(task=self.task, user=self.user, started_at=now - timedelta(seconds=30), ended_at=now),
+		])
+		self.assertEqual(sorted(FocusSession.objects.values_list("duration_minutes", "success")), [(0, False), (40, True)])
+
+		FocusSession.objects.update(ended_at=now + timedelta(minutes=5))
+		self.assertEqual(sorted(FocusSession.objects.values_list("duration_minutes", flat=True)), [5, 45])
+
+		session = FocusSession.objects.order_by("started_at").first()
+		session.ended_at = None
+		session.save()
+		self.assertEqual((session.duration_minutes, session.success), (0, False))
+
+	def test_second_open_session_via_create_is_409(self):
+		first = self.client.post("/api/focus-sessions/", {"task": self.task.pk}, format="json")
+		self.assertEqual(first.status_code, 201)
+		second = self.client.post("/api/focus-sessions/", {"task": self.task.pk}, format="json")
+		self.assertEqual(second.status_code, 409)
+
+	def test_cannot_start_on_someone_elses_task(self):
+		other = get_user_model().objects.create_user(username="u2", password="pw")
+		task = Task.objects.create(user=other, title="X")
+		self.assertEqual(self.client.post(f"/api/tasks/{task.id}/start-focus/").status_code, 404)
+
+
+class DashboardTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		User = get_user_model()
+		self.user = User.objects.create_user(username="u1", password="pw")
+		self.task = Task.objects.create(user=self.user, title="T")
+		Setting.objects.create(user=self.user)
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def test_sections_are_cached_until_their_data_changes(self):
+		first = self.client.get("/api/dashboard/").json()
+		self.assertEqual(first["me"]["username"], "u1")
+		self.assertEqual([t["title"] for t in first["tasks"]], ["T"])
+		self.assertEqual(first["notes"], [])
+
+		with CaptureQueriesContext(connection) as ctx:
+			self.client.get("/api/dashboard/")
+		self.assertEqual(app_queries(ctx), [])
+
+		Note.objects.create(user=self.user, title="N")
+		with CaptureQueriesContext(connection) as ctx:
+			second = self.client.get("/api/dashboard/").json()
+		self.assertEqual(len(app_queries(ctx)), 1)
+		self.assertEqual([n["title"] for n in second["notes"]], ["N"])
+		self.assertNotEqual(first["versions"]["notes"], second["versions"]["notes"])
+		self.assertEqual(first["versions"]["tasks"], second["versions"]["tasks"])
+
+	@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+	def test_per_process_cache_is_not_used_for_sections(self):
+		self.client.get("/api/dashboard/")
+		with CaptureQueriesContext(connection) as ctx:
+			self.client.get("/api/dashboard/")
+		self.assertTrue(app_queries(ctx))
+		with override_settings(DEBUG=False):
+			self.assertEqual([w.id for w in check_shared_cache(None)], ["core.W001"])
+
+	def test_sections_filter(self):
+		data = self.client.get("/api/dashboard/", {"sections": "tasks,weekly"}).json()
+		self.assertEqual(set(data), {"tasks", "weekly", "versions"})
+		self.assertEqual(self.client.get("/api/dashboard/", {"sections": "nope"}).status_code, 400)
+
+
+class CompressionTests(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.user = User.objects.create_user(username="u1", password="pw")
+		for i in range(30):
+			Task.objects.create(user=self.user, title=f"Task {i}")
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def test_gzip_when_accepted(self):
+		plain = self.client.get("/api/tasks/")
+		self.assertFalse(plain.has_header("Content-Encoding"))
+
+		resp = self.client.get("/api/tasks/", HTTP_ACCEPT_ENCODING="gzip;q=1.0, identity;q=0.5")
+		self.assertEqual(resp["Content-Encoding"], "gzip")
+		self.assertIn("Accept-Encoding", resp["Vary"])
+		self.assertEqual(gzip.decompress(resp.content), plain.content)
+
+	def test_small_bodies_left_alone(self):
+		resp = self.client.get("/api/notes/", HTTP_ACCEPT_ENCODING="gzip")
+		self.assertFalse(resp.has_header("Content-Encoding"))
+
+	def test_omit_default_colors(self):
+		Task.objects.filter(title="Task 0").update(color="#123456")
+		rows = self.client.get("/api/tasks/", {"omit_defaults": "1"}).json()
+		by_title = {row["title"]: row for row in rows}
+		self.assertEqual(by_title["Task 0"]["color"], "#123456")
+		self.assertNotIn("theme_color", by_title["Task 0"])
+		self.assertNotIn("color", by_title["Task 1"])
+		task = Task.objects.get(title="Task 1")
+		self.assertEqual(TaskSerializer(task, context={"omit_default_colors": True}).data, omit_default_colors(TaskRowSerializer(Task.objects.filter(pk=task.pk)).data[0]))
+
+
+class StartupProfileTests(TestCase):
+	def test_import_profile_groups_by_package(self):
+		stderr = "\n".join([
+			"import time: self [us] | cumulative | imported package",
+			"import time:       100 |        100 |     rest_framework.compat",
+			"import time:        50 |        150 |   rest_framework.views",
+			"import time:       300 |        300 | yaml",
+		])
+		self.assertEqual(import_profile(stderr), [("yaml", 300), ("rest_framework.compat", 100), ("rest_framework.views", 50)])
+
+
+@override_settings(REPLICA_DATABASE="replica", REPLICA_STICKY_SECONDS=10)
+class ReplicaRouterTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.router = ReplicaRouter()
+
+	def test_reads_go_to_replica_until_a_write(self):
+		self.assertIsNone(self.router.db_for_read(Task))
+		with replica_reads():
+			self.assertEqual(self.router.db_for_read(Task), "replica")
+			self.assertEqual(self.router.db_for_write(Task), "default")
+			self.assertIsNone(self.router.db_for_read(Task))
+		self.assertFalse(self.router.allow_migrate("replica", "core"))
+
+	@override_settings(REPLICA_DATABASE=None)
+	def test_no_replica_configured(self):
+		with replica_reads():
+			self.assertIsNone(self.router.db_for_read(Task))
+
+	def test_write_pins_user_to_primary(self):
+		user = get_user_model().objects.create_user(username="u1", password="pw")
+		client = APIClient()
+		client.force_authenticate(user)
+		self.assertFalse(is_pinned(user.pk))
+		client.post("/api/notes/", {"title": "N", "content": ""}, format="json")
+		self.assertTrue(is_pinned(user.pk))
+
+		# A worker that doesn't see the cached pin still gets it from the client.
+		cache.clear()
+		request = APIRequestFactory().get("/api/notes/")
+		request.COOKIES[REPLICA_PIN_COOKIE] = client.cookies[REPLICA_PIN_COOKIE].value
+		self.assertTrue(is_pinned(user.pk, request))
+		self.assertFalse(is_pinned(user.pk + 1, request))
+
+
+class NoteContentTests(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.user = User.objects.create_user(username="u1", password="pw")
+		self.note = Note.objects.create(user=self.user, title="N", content="hello world " * 100)
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def test_list_returns_excerpt_detail_returns_content(self):
+		row = self.client.get("/api/notes/").json()[0]
+		self.assertNotIn("content", row)
+		self.assertEqual(row["excerpt"], self.note.content[:280])
+		self.assertEqual(row["content_size"], 1200)
+
+		detail = self.client.get(f"/api/notes/{self.note.id}/").json()
+		self.assertEqual(detail["content"], self.note.content)
+		self.assertEqual(detail["content_hash"], row["content_hash"])
+
+	def test_patch_applies_edits_against_base(self):
+		edits = [{"offset": 0, "delete": 5, "insert": "HELLO"}, {"offset": 1199, "delete": 1, "insert": "!"}]
+		resp = self.client.patch(f"/api/notes/{self.note.id}/", {"content_patch": edits, "base_hash": self.note.content_hash}, format="json")
+		self.assertEqual(resp.status_code, 200)
+		self.assertNotIn("content", resp.json())
+
+		self.note.refresh_from_db()
+		self.assertTrue(self.note.content.startswith("HELLO world"))
+		self.assertTrue(self.note.content.endswith("world!"))
+		self.assertEqual(resp.json()["content_hash"], self.note.content_hash)
+
+		stale = self.client.patch(f"/api/notes/{self.note.id}/", {"content_patch": edits, "base_hash": "0" * 64}, format="json")
+		self.assertEqual(stale.status_code, 409)
+		overlapping = [{"offset": 5, "delete": 2}, {"offset": 6, "insert": "x"}]
+		resp = self.client.patch(f"/api/notes/{self.note.id}/", {"content_patch": overlapping, "base_hash": self.note.content_hash}, format="json")
+		self.assertEqual(resp.status_code, 400)
+
+
+class RecurringBlockTests(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.user = User.objects.create_user(username="u1", password="pw")
+		self.task = Task.objects.create(user=self.user, title="Standup")
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+		start = timezone.make_aware(timezone.datetime(2026, 1, 5, 9, 0))  # a Monday
+		self.daily = Block.objects.create(task=self.task, start_date=start, end_date=start + timedelta(minutes=15), recurrence="daily")
+
+	def occurrences(self, start, end):
+		resp = self.client.get("/api/blocks/occurrences/", {"start": start, "end": end})
+		self.assertEqual(resp.status_code, 200)
+		return resp.json()
+
+	def test_expands_only_inside_window(self):
+		items = self.occurrences("2027-03-01", "2027-03-04")
+		self.assertEqual([item["start_date"] for item in items], ["2027-03-01T09:00:00Z", "2027-03-02T09:00:00Z", "2027-03-03T09:00:00Z"])
+		self.assertEqual({item["id"] for item in items}, {self.daily.id})
+
+	def test_weekly_weekdays_and_count(self):
+		start = timezone.make_aware(timezone.datetime(2026, 1, 5, 14, 0))
+		Block.objects.create(task=self.task, start_date=start, end_date=start + timedelta(hours=1), recurrence="weekly", recurrence_weekdays=[0, 3], recurrence_count=3)
+		self.daily.delete()
+		items = self.occurrences("2026-01-01", "2026-02-01")
+		self.assertEqual([item["start_date"][:10] for item in items], ["2026-01-05", "2026-01-08", "2026-01-12"])
+
+	def test_overrides(self):
+		url = f"/api/blocks/{self.daily.id}/override/"
+		self.assertEqual(self.client.put(url, {"occurrence_start": "2026-01-06T09:00:00Z", "cancelled": True}, format="json").status_code, 200)
+		self.client.put(url, {"occurrence_start": "2026-01-07T09:00:00Z", "done": True, "start_date": "2026-01-10T12:00:00Z", "end_date": "2026-01-10T12:15:00Z"}, format="json")
+		self.assertEqual(self.client.put(url, {"occurrence_start": "2026-01-07T10:00:00Z"}, format="json").status_code, 400)
+
+		items = self.occurrences("2026-01-05", "2026-01-08")
+		self.assertEqual([item["start_date"] for item in items], ["2026-01-05T09:00:00Z"])
+		moved = [item for item in self.occurrences("2026-01-10", "2026-01-11") if item["done"]]
+		self.assertEqual(moved[0]["start_date"], "2026-01-10T12:00:00Z")
+		self.assertEqual(moved[0]["occurrence_start"], "2026-01-07T09:00:00Z")
+
+		self.client.delete(url + "?occurrence_start=2026-01-06T09:00:00Z")
+		self.assertEqual(len(self.occurrences("2026-01-05", "2026-01-08")), 2)
+
+
+	def test_start_only_move_keeps_duration(self):
+		url = f"/api/blocks/{self.daily.id}/override/"
+		resp = self.client.put(url, {"occurrence_start": "2026-01-06T09:00:00Z", "start_date": "2026-01-20T15:00:00Z"}, format="json")
+		self.assertEqual(resp.status_code, 200)
+		moved = [item for item in self.occurrences("2026-01-20", "2026-01-21") if item["occurrence_start"] == "2026-01-06T09:00:00Z"]
+		self.assertEqual((moved[0]["start_date"], moved[0]["end_date"]), ("2026-01-20T15:00:00Z", "2026-01-20T15:15:00Z"))
+		self.assertEqual(self.client.put(url, {"occurrence_start": "2026-01-07T09:00:00Z", "end_date": "2026-01-07T08:00:00Z"}, format="json").status_code, 400)
+
+	def test_keeps_local_time_across_dst_in_owner_zone(self):
+		Setting.objects.create(user=self.user, timezone="Europe/Berlin")
+		self.daily.delete()
+		start = timezone.make_aware(timezone.datetime(2026, 3, 27, 9, 0), ZoneInfo("Europe/Berlin"))
+		block = Block.objects.create(task=self.task, start_date=start, end_date=start + timedelta(minutes=30), recurrence="daily")
+		items = self.occurrences("2026-03-28", "2026-03-31")
+		# Berlin moves to summer time on March 29.
+		self.assertEqual(
+			[item["start_date"] for item in items],
+			["2026-03-28T08:00:00Z", "2026-03-29T07:00:00Z", "2026-03-30T07:00:00Z"],
+		)
+		url = f"/api/blocks/{block.id}/override/"
+		self.assertEqual(self.client.put(url, {"occurrence_start": "2026-03-30T07:00:00Z", "done": True}, format="json").status_code, 200)
+		self.assertEqual(self.client.put(url, {"occurrence_start": "2026-03-30T08:00:00Z", "done": True}, format="json").status_code, 400)
+
+
+class TaskPositionTests(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.user = User.objects.create_user(username="u1", password="pw")
+		self.a, self.b, self.c = (Task.objects.create(user=self.user, title=title) for title in "abc")
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def column(self, status="todo"):
+		return [task["title"] for task in self.client.get("/api/tasks/", {"status": status}).json()]
+
+	def test_key_between(self):
+		self.assertLess(key_between("a", "b"), "b")
+		self.assertGreater(key_between("a", "b"), "a")
+		self.assertLess(key_between(None, "0001"), "0001")
+		with self.assertRaises(ValueError):
+			key_between("b", "a")
+
+	def test_new_tasks_on_top_and_move_writes_one_row(self):
+		self.assertEqual(self.column(), ["c", "b", "a"])
+		with CaptureQueriesContext(connection) as ctx:
+			resp = self.client.post(f"/api/tasks/{self.a.id}/move/", {"after": self.c.id, "before": self.b.id}, format="json")
+		self.assertEqual(resp.status_code, 200)
+		updates = [sql for sql in app_queries(ctx) if sql.startswith("UPDATE")]
+		self.assertEqual(len(updates), 1)
+		self.assertEqual(self.column(), ["c", "a", "b"])
+
+		self.client.post(f"/api/tasks/{self.c.id}/move/", {"status": "doing", "after": None, "before": None}, format="json")
+		# Both neighbours null is only allowed into an empty column.
+		top = self.client.post(f"/api/tasks/{self.b.id}/move/", {"after": None, "before": None}, format="json")
+		self.assertEqual(top.status_code, 400)
+		self.assertEqual(self.column(), ["a", "b"])
+		self.assertEqual(self.column("doing"), ["c"])
+
+		stale = self.client.post(f"/api/tasks/{self.a.id}/move/", {"after": self.b.id, "before": self.b.id}, format="json")
+		self.assertEqual(stale.status_code, 409)
+
+	def test_status_change_takes_a_fresh_key(self):
+		doing = Task.objects.create(user=self.user, title="d", status="doing")
+		self.client.patch(f"/api/tasks/{self.a.id}/", {"status": "doing"}, format="json")
+		positions = list(Task.objects.filter(status="doing").order_by("position").values_list("title", "position"))
+		self.assertEqual([title for title, _ in positions], ["a", "d"])
+		self.assertEqual(len({position for _, position in positions}), 2)
+
+		resp = self.client.post(f"/api/tasks/{self.b.id}/move/", {"status": "doing", "after": self.a.id, "before": doing.id}, format="json")
+		self.assertEqual(resp.status_code, 200)
+		self.assertEqual(self.column("doing"), ["a", "b", "d"])
+
+	def test_move_between_equal_keys_rebalances(self):
+		Task.objects.filter(pk__in=[self.b.id, self.c.id]).update(position="i")
+		# Ties rebalance newest first, matching the list order the client saw.
+		resp = self.client.post(f"/api/tasks/{self.a.id}/move/", {"after": self.c.id, "before": self.b.id}, format="json")
+		self.assertEqual(resp.status_code, 200)
+		self.assertEqual(self.column(), ["c", "a", "b"])
+		self.assertEqual(len(set(Task.objects.values_list("position", flat=True))), 3)
+
+	def test_rebalance_keeps_order(self):
+		before = self.column()
+		Task.rebalance(self.user.pk, "todo")
+		self.assertEqual(self.column(), before)
+		self.assertTrue(all(len(position) == 1 for position in Task.objects.values_list("position", flat=True)))
+
+
+class AdminChangelistTests(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.admin = User.objects.create_superuser(username="admin", password="pw")
+		self.client.force_login(self.admin)
+
+	def add_rows(self, count):
+		for i in range(count):
+			task = Task.objects.create(user=self.admin, title=f"T{i}", status="done")
+			FocusSession.objects.create(task=task, ended_at=timezone.now())
+			Block.objects.create(task=task)
+
+	def test_query_count_does_not_grow_with_rows(self):
+		counts = []
+		for _ in range(2):
+			self.add_rows(3)
+			with CaptureQueriesContext(connection) as ctx:
+				for url in ("/admin/core/focussession/", "/admin/core/block/"):
+					self.assertEqual(self.client.get(url).status_code, 200)
+			counts.append(len(ctx.captured_queries))
+		self.assertEqual(counts[0], counts[1])
+
+
+class UserDayClockTests(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.user = User.objects.create_user(username="u1", password="pw")
+		Setting.objects.create(user=self.user, timezone="America/New_York", day_bounds=[4, 22])
+		self.task = Task.objects.create(user=self.user, title="T")
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def session(self, local):
+		started = timezone.make_aware(local, ZoneInfo("America/New_York"))
+		FocusSession.objects.create(task=self.task, started_at=started, ended_at=started + timedelta(minutes=30))
+
+	def test_sessions_bucket_by_user_day(self):
+		# Before 04:00 local still counts for the previous day.
+		self.session(timezone.datetime(2026, 1, 6, 3, 30))
+		self.session(timezone.datetime(2026, 1, 12, 3, 0))
+		self.assertEqual(
+			sorted(DaySummary.objects.values_list("date", "total_focused_minutes")),
+			[(timezone.datetime(2026, 1, 5).date(), 30), (timezone.datetime(2026, 1, 11).date(), 30)],
+		)
+
+		weekly = self.client.get("/api/day-summaries/weekly/", {"weeks": 2, "start": "2026-01-05"}).json()
+		self.assertEqual([(w["week_start"], w["focused_minutes"]) for w in weekly["items"]], [("2026-01-05", 60)])
+
+	def test_monthly_buckets_by_user_day(self):
+		# 03:00 on Feb 1 is still January 31 for this user.
+		self.session(timezone.datetime(2026, 2, 1, 3, 0))
+		self.session(timezone.datetime(2026, 2, 1, 5, 0))
+		monthly = self.client.get("/api/day-summaries/monthly/", {"months": 2, "start": "2026-01-01"}).json()
+		self.assertEqual(
+			[(m["month"], m["focused_minutes"]) for m in monthly["items"]],
+			[("2026-01", 30), ("2026-02", 30)],
+		)
+
+	def test_rejects_unknown_timezone(self):
+		resp = self.client.patch("/api/setting/me/", {"timezone": "Mars/Olympus"}, format="json")
+		self.assertEqual(resp.status_code, 400)
+
+
+@override_settings(DELETION_INLINE_LIMIT=3, DELETION_CHUNK_SIZE=2, DELETION_BACKGROUND="command")
+class DeletionTests(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.user = User.objects.create_user(username="u1", password="pw")
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def task_with_sessions(self, count):
+		task = Task.objects.create(user=self.user, title="T")
+		for _ in range(count):
+			FocusSession.objects.create(task=task, ended_at=timezone.now())
+		Block.objects.create(task=task)
+		return task
+
+	def test_small_task_is_deleted_inline(self):
+		task = self.task_with_sessions(1)
+		self.assertEqual(self.client.delete(f"/api/tasks/{task.pk}/").status_code, 204)
+		self.assertFalse(Task.objects.exists())
+		self.assertEqual(Tombstone.objects.filter(model="focus_sessions").count(), 1)
+		self.assertEqual(DaySummary.objects.get().total_focused_minutes, 0)
+
+	def test_large_task_is_deleted_by_job(self):
+		task = self.task_with_sessions(5)
+		resp = self.client.delete(f"/api/tasks/{task.pk}/")
+		self.assertEqual(resp.status_code, 202)
+		self.assertEqual(resp.json()["status"], "pending")
+		# Asking again reuses the open job.
+		self.assertEqual(self.client.delete(f"/api/tasks/{task.pk}/").json()["id"], resp.json()["id"])
+		# Until the job runs the task is hidden and can't be changed.
+		self.assertEqual(self.client.get(f"/api/tasks/{task.pk}/").status_code, 404)
+		self.assertEqual(self.client.patch(f"/api/tasks/{task.pk}/", {"title": "x"}, format="json").status_code, 404)
+		self.assertEqual(self.client.post(f"/api/tasks/{task.pk}/start-focus/").status_code, 404)
+		self.assertNotIn(task.pk, [row["id"] for row in self.client.get("/api/tasks/").json()])
+
+		self.assertEqual(run_pending(), 1)
+		job = self.client.get(resp["Location"]).json()
+		self.assertEqual((job["status"], job["rows_deleted"]), ("done", 7))
+		self.assertFalse(FocusSession.objects.exists())
+		self.assertEqual(Tombstone.objects.filter(model="tasks", object_id=task.pk).count(), 1)
+		self.assertEqual(DaySummary.objects.get().total_focused_minutes, 0)
+
+	def test_pending_task_is_gone_from_dashboard_and_sync(self):
+		task = self.task_with_sessions(5)
+		kept = Task.objects.create(user=self.user, title="Kept")
+		dashboard = self.client.get("/api/dashboard/").json()
+		token = self.client.get("/api/sync/").json()["token"]
+		self.assertIn(task.pk, [row["id"] for row in dashboard["tasks"]])
+
+		self.assertEqual(self.client.delete(f"/api/tasks/{task.pk}/").status_code, 202)
+		dashboard = self.client.get("/api/dashboard/").json()
+		self.assertEqual([row["id"] for row in dashboard["tasks"]], [kept.pk])
+		self.assertEqual(dashboard["blocks"], [])
+		full = self.client.get("/api/sync/").json()["changes"]
+		self.assertEqual([row["id"] for row in full["tasks"]], [kept.pk])
+		self.assertEqual((full["focus_sessions"], full["blocks"]), ([], []))
+		delta = self.client.get("/api/sync/", {"since": token}).json()
+		self.assertIn(task.pk, delta["deleted"]["tasks"])
+
+	def test_account_deletion(self):
+		self.task_with_sessions(2)
+		Note.objects.create(user=self.user, title="N")
+		token = RefreshToken.for_user(self.user).access_token
+		client = APIClient()
+		client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+		resp = client.delete("/api/auth/me/")
+		self.assertEqual(resp.status_code, 202)
+		self.user.refresh_from_db()
+		self.assertFalse(self.user.is_active)
+		# The deactivated user's token still rides along; the status URL ignores it.
+		self.assertEqual(client.get("/api/auth/me/").status_code, 401)
+		self.assertEqual(client.get(resp["Location"]).json()["status"], "pending")
+
+		run_pending()
+		self.assertEqual(DeletionJob.objects.get().status, "done")
+		self.assertEqual(APIClient().get(resp.json()["status_url"]).json()["status"], "done")
+		self.assertEqual(APIClient().get(resp["Location"][:-2] + "x/").status_code, 404)
+		self.assertFalse(get_user_model().objects.exists())
+		self.assertFalse(Task.objects.exists() or Note.objects.exists() or Tombstone.objects.exists())
+
+
+class DatabaseVendorCheckTests(TestCase):
+	def test_supported_vendor_passes(self):
+		self.assertEqual(check_database_vendor(None, databases=["default"]), [])
+
+	def test_other_vendors_are_refused(self):
+		with mock.patch.object(connection, "vendor", "mysql"):
+			self.assertEqual([e.id for e in check_database_vendor(None, databases=["default"])], ["core.E001"])
+			query = FocusSession.objects.annotate(minutes=MinutesBetween("started_at", "ended_at")).query
+			with self.assertRaises(NotSupportedError):
+				query.get_compiler("default").as_sql()
+
+
+class HealthProbeTests(TestCase):
+	def test_healthz_skips_auth_and_database(self):
+		with self.assertNumQueries(0):
+			resp = self.client.get("/healthz", HTTP_HOST="10.0.0.5")
+		self.assertEqual(resp.status_code, 200)
+		self.assertEqual(resp.json()["status"], "ok")
+		self.assertEqual(resp["Cache-Control"], "no-store")
+
+	def test_readyz_reports_checks_and_latency(self):
+		self.client.get("/api/tasks/")
+		resp = self.client.get("/readyz")
+		self.assertEqual(resp.status_code, 200)
+		data = resp.json()
+		self.assertTrue(all(check["ok"] for check in data["checks"].values()))
+		self.assertGreaterEqual(data["requests"], 1)
+		self.assertIsNotNone(data["p95_ms"])
+
+
+class QueryPlanTests(TestCase):
+	def test_plans_match_baseline(self):
+		if load_baseline() is None:
+			self.skipTest(f"No query plan baseline for {connection.vendor}")
+		self.assertEqual(check(), [])
+
+	def test_compare_flags_shape_and_cost(self):
+		plan = {"shape": ["Index Scan on core_task using core_task_user_id"], "cost": 10.0, "rows": 40}
+		baseline = {"plans": {"task_list": [plan]}}
+		worse = {"shape": ["Seq Scan on core_task"], "cost": 10.0, "rows": 40}
+		self.assertEqual(compare(baseline, baseline), [])
+		self.assertIn("plan changed", compare(baseline, {"plans": {"task_list": [worse]}})[0])
+		self.assertIn("estimated cost", compare(baseline, {"plans": {"task_list": [{**plan, "cost": 20.0}]}})[0])
+		self.assertIn("now 2", compare(baseline, {"plans": {"task_list": [plan, plan]}})[0])
+
+
+@override_settings(THROTTLE_BUCKET_CAPACITY=0)
+class WorkloadTests(TestCase):
+	def test_seed_and_replay_synthetic_mix(self):
+		rng = random.Random(0)
+		names = seed_workload(
+			"load", 2,
+			tasks_per_user=Distribution("const:3"),
+			sessions_per_day=Distribution("poisson:2"),
+			session_minutes=Distribution("uniform:10-40"),
+			notes_per_user=Distribution("1"),
+			note_size=Distribution("lognormal:500,0.5"),
+			days=7,
+			rng=rng,
+		)
+		self.assertEqual(Task.objects.count(), 6)
+		self.assertEqual(
+			DaySummary.objects.aggregate(total=Sum("total_focused_minutes"))["total"],
+			FocusSession.objects.aggregate(total=Sum("duration_minutes"))["total"],
+		)
+
+		events = synthetic_events(names, 60, DEFAULT_MIX, rng)
+		report = Replayer().run(events)
+		self.assertEqual(report["requests"], 60)
+		self.assertFalse(any(route["errors"] for route in report["routes"].values()))
+		self.assertIn("POST task-start-focus", report["routes"])
+
+	def test_rejects_bad_distribution(self):
+		with self.assertRaises(ValueError):
+			Distribution("zipf:2")
+
+
+class OpenSessionGuardMigrationTests(TransactionTestCase):
+	before = [("core", "0024_restore_daysummary_unique")]
+	after = [("core", "0025_focussession_user_open_guard")]
+
+	def tearDown(self):
+		executor = MigrationExecutor(connection)
+		executor.migrate(executor.loader.graph.leaf_nodes())
+
+	def test_duplicate_open_sessions_are_closed(self):
+		executor = MigrationExecutor(connection)
+		executor.migrate(self.before)
+		apps = executor.loader.project_state(self.before).apps
+		user = apps.get_model("auth", "User").objects.create(username="u1")
+		task = apps.get_model("core", "Task").objects.create(user_id=user.pk, title="T")
+		FocusSession = apps.get_model("core", "FocusSession")
+		started = timezone.now() - timedelta(hours=2)
+		older = FocusSession.objects.create(task=task, started_at=started)
+		newest = FocusSession.objects.create(task=task, started_at=started + timedelta(minutes=45))
+
+		executor = MigrationExecutor(connection)
+		executor.migrate(self.after)
+		apps = executor.loader.project_state(self.after).apps
+		FocusSession = apps.get_model("core", "FocusSession")
+		self.assertEqual(list(FocusSession.objects.filter(ended_at__isnull=True).values_list("pk", flat=True)), [newest.pk])
+		older = FocusSession.objects.get(pk=older.pk)
+		self.assertEqual((older.ended_at, older.duration_minutes), (newest.started_at, 45))
+		summary = apps.get_model("core", "DaySummary").objects.get(user_id=user.pk)
+		self.assertEqual(summary.total_focused_minutes, 45)
@@ -0,0 +1,80 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+
+class CostThrottle(BaseThrottle):
+    """Per-client token bucket where each request spends its action's cost.
+
+    The bucket holds THROTTLE_BUCKET_CAPACITY tokens and refills at
+    THROTTLE_REFILL_PER_SECOND. Views list heavier actions in a
+    `throttle_costs` mapping of action name to cost, or a flat `throttle_cost`
+    for plain APIViews; anything else costs
+    `read_cost` for safe methods and `write_cost` otherwise. Buckets live in
+    the shared default cache, keyed by user id or, for anonymous requests,
+    client IP. Each debit holds a short lock taken with `cache.add`, which
+    is atomic on every backend. Without it, concurrent requests would read
+    the same balance and spend the same tokens.
+    """
+    cache = default_cache
+    read_cost = 1
+    write_cost = 2
+    # A holder that died releases the lock after lock_timeout seconds; a
+    # request that can't get it within lock_wait is refused, not let through.
+    lock_timeout = 2
+    lock_wait = 0.25
+
+    def get_cost(self, request, view):
+        costs = getattr(view, "throttle_costs", {})
+        action = getattr(view, "action", None)
+        if action in costs:
+            return costs[action]
+        if getattr(view, "throttle_cost", None) is not None:
+            return view.throttle_cost
+        return self.read_cost if request.method in SAFE_METHODS else self.write_cost
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f"throttle:user:{request.user.pk}"
+        return f"throttle:anon:{self.get_ident(request)}"
+
+    def allow_request(self, request, view):
+        capacity = settings.THROTTLE_BUCKET_CAPACITY
+        rate = settings.THROTTLE_REFILL_PER_SECOND
+        if capacity <= 0 or rate <= 0:
+            return True
+
+        key = self.get_cache_key(request, view)
+        cost = self.get_cost(request, view)
+        lock = f"{key}:lock"
+        if not self.acquire(lock):
+            self.wait_seconds = self.lock_wait
+            return False
+        try:
+            now = time.time()
+            tokens, stamp = self.cache.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - stamp) * rate)
+
+            self.wait_seconds = None
+            if tokens < cost:
+                self.wait_seconds = (cost - tokens) / rate
+            else:
+                tokens -= cost
+            self.cache.set(key, (tokens, now), int(capacity / rate) + 1)
+        finally:
+            self.cache.delete(lock)
+        return self.wait_seconds is None
+
+    def acquire(self, lock):
+        deadline = time.monotonic() + self.lock_wait
+        while not self.cache.add(lock, 1, self.lock_timeout):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.002)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
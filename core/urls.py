@@ -3,6 +3,8 @@ from rest_framework import routers
 from rest_framework_simplejwt.views import TokenRefreshView
 
 from .views.auth import LoginView, RegisterView, MeView
+from .views.sync import SyncView
+from .views.dashboard import DashboardView
 from .views.main import (
 	TaskViewSet,
 	FocusSessionViewSet,
@@ -10,6 +12,8 @@ from .views.main import (
 	BlockViewSet,
 	SettingViewSet,
 	NoteViewSet,
+	DeletionJobViewSet,
+	DeletionStatusView,
 )
 
 router = routers.DefaultRouter()
@@ -19,11 +23,15 @@ router.register("day-summaries", DaySummaryViewSet, basename="day-summary")
 router.register("blocks", BlockViewSet, basename="block")
 router.register("setting", SettingViewSet, basename="setting")
 router.register("notes", NoteViewSet, basename="note")
+router.register("deletions", DeletionJobViewSet, basename="deletion")
 
 urlpatterns = [
+	path("deletions/status/<str:token>/", DeletionStatusView.as_view(), name="deletion-status"),
 	path("", include(router.urls)),
 	path("auth/register/", RegisterView.as_view(), name="auth-register"),
 	path("auth/login/", LoginView.as_view(), name="auth-login"),
 	path("auth/refresh/", TokenRefreshView.as_view(), name="auth-refresh"),
 	path("auth/me/", MeView.as_view(), name="auth-me"),
+	path("sync/", SyncView.as_view(), name="sync"),
+	path("dashboard/", DashboardView.as_view(), name="dashboard"),
 ]
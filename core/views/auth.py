@@ -1,9 +1,15 @@
+from django.contrib.auth import get_user_model
 from rest_framework import generics, permissions, response, status
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from core.deletion import enqueue
+from core.models.main import DeletionJob
 from core.serializers.auth import LoginSerializer, RegisterSerializer, UserSerializer
+from core.views.main import deletion_accepted
+
+User = get_user_model()
 
 
 class RegisterView(generics.CreateAPIView):
@@ -32,4 +38,16 @@ class MeView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        return response.Response(UserSerializer(request.user).data)
+        user = request.user
+        if user.get_deferred_fields():
+            # CachedJWTAuthentication only loads the id; fetch the row once.
+            user = User.objects.get(pk=user.pk)
+        return response.Response(UserSerializer(user).data)
+
+    def delete(self, request):
+        """Deactivate the account now and delete its data in the background (202)."""
+        user = User.objects.get(pk=request.user.pk)
+        user.is_active = False
+        # save() rather than update(), so the cached auth state is dropped.
+        user.save(update_fields=["is_active"])
+        return deletion_accepted(request, enqueue(user.pk, DeletionJob.Kind.ACCOUNT, user.pk))
@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import exceptions, permissions, response
+from rest_framework.views import APIView
+
+from core.caching import is_shared
+from core.deletion import pending_targets
+from core.models.main import Task, DaySummary, Block, Setting, Note, DeletionJob, dashboard_version
+from core.serializers.auth import UserSerializer
+from core.serializers.fast import TaskRowSerializer, BlockRowSerializer
+from core.serializers.main import DaySummarySerializer, SettingSerializer, NoteListSerializer
+from core.views.main import ReplicaReadMixin, weekly_rollup
+
+DASHBOARD_WEEKS = 12
+
+
+class DashboardView(ReplicaReadMixin, APIView):
+    """Everything the app loads on start, in one response.
+
+    Holds the same data as /auth/me/, /setting/me/, /tasks/, /blocks/,
+    /notes/, /day-summaries/ and /day-summaries/weekly/. Each section is
+    cached on its own under a per-user version stamp that model signals
+    bump (see core.models.main.DASHBOARD_SECTIONS), so a change to one note
+    only rebuilds `notes`. With a per-process cache nothing is cached.
+    `?sections=tasks,notes` limits the response.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    # Replaces seven requests; cheaper than seven reads but not free.
+    throttle_cost = 4
+
+    def get_sections(self):
+        return {
+            "me": self.build_me,
+            "setting": self.build_setting,
+            "tasks": self.build_tasks,
+            "blocks": self.build_blocks,
+            "notes": self.build_notes,
+            "day_summaries": self.build_day_summaries,
+            "weekly": self.build_weekly,
+        }
+
+    def build_me(self, user):
+        if user.get_deferred_fields():
+            user = get_user_model().objects.get(pk=user.pk)
+        return UserSerializer(user).data
+
+    def build_setting(self, user):
+        setting, _ = Setting.objects.get_or_create(user=user)
+        return SettingSerializer(setting).data
+
+    def build_tasks(self, user):
+        tasks = Task.objects.filter(user=user).exclude(pk__in=pending_targets(user.pk, DeletionJob.Kind.TASK))
+        return TaskRowSerializer(tasks.order_by("status", "position")).data
+
+    def build_blocks(self, user):
+        blocks = Block.objects.filter(task__user=user).exclude(task__in=pending_targets(user.pk, DeletionJob.Kind.TASK))
+        return BlockRowSerializer(blocks.order_by("-start_date")).data
+
+    def build_notes(self, user):
+        notes = Note.objects.filter(user=user).order_by("-updated_at").defer("content")
+        return NoteListSerializer(notes, many=True).data
+
+    def build_day_summaries(self, user):
+        return DaySummarySerializer(DaySummary.objects.filter(user=user).order_by("-date"), many=True).data
+
+    def build_weekly(self, user):
+        return weekly_rollup(user, DASHBOARD_WEEKS)
+
+    def cache_key(self, user, name, version):
+        # Week and day boundaries move with the clock, not only with writes;
+        # users' days start on the hour in their own zone, so key by hour.
+        return f"dashboard:{user.pk}:{name}:{version}:{timezone.now():%Y%m%d%H}"
+
+    def get(self, request):
+        sections = self.get_sections()
+        requested = request.query_params.get("sections")
+        if requested:
+            names = [name.strip() for name in requested.split(",") if name.strip()]
+            unknown = sorted(set(names) - set(sections))
+            if unknown:
+                raise exceptions.ValidationError({"sections": f"Unknown sections: {', '.join(unknown)}."})
+        else:
+            names = list(sections)
+
+        user = request.user
+        versions = {name: dashboard_version(user.pk, name) for name in names}
+        keys = {name: self.cache_key(user, name, versions[name]) for name in names}
+        # A per-process cache misses bumps made by other workers; build every time.
+        cached = cache.get_many(keys.values()) if is_shared() else {}
+
+        data = {}
+        fresh = {}
+        for name in names:
+            if keys[name] in cached:
+                data[name] = cached[keys[name]]
+            else:
+                data[name] = fresh[keys[name]] = sections[name](user)
+        if fresh and is_shared():
+            cache.set_many(fresh, settings.DASHBOARD_CACHE_TTL)
+
+        data["versions"] = {name: str(version) for name, version in versions.items()}
+        return response.Response(data)
@@ -1,52 +1,345 @@
-from rest_framework import viewsets, decorators, response, status, permissions
+from rest_framework import viewsets, decorators, response, serializers, status, permissions, exceptions
+from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.urls import reverse
 from django.utils import timezone
-from django.db.models import Sum, Count, Case, When, IntegerField
-from django.db.models.functions import TruncWeek, TruncMonth
+from django.utils.dateparse import parse_date, parse_datetime
+from django.db.models import Q, Sum, Count, Case, When, IntegerField
 from datetime import timedelta
-
-from core.models.main import Task, FocusSession, DaySummary, Block, Setting, Note
+from rest_framework.views import APIView
+
+from core.models.main import (
+    Task,
+    FocusSession,
+    DaySummary,
+    Block,
+    BlockException,
+    Setting,
+    Note,
+    DeletionJob,
+    ArchivedTask,
+    ArchivedFocusSession,
+    ArchivedBlock,
+    bump_dashboard,
+    POSITION_MAX_LENGTH,
+)
+from core.deletion import delete_tasks, enqueue, pending_targets
+from core.ordering import key_between
+from core.recurrence import expand
+from core.routers import replica_alias, open_scope, close_scope, is_pinned, pin_primary
 from core.serializers.main import (
     TaskSerializer,
     FocusSessionSerializer,
     DaySummarySerializer,
     BlockSerializer,
+    BlockExceptionSerializer,
     SettingSerializer,
     NoteSerializer,
+    NoteListSerializer,
+    DeletionJobSerializer,
+    ArchivedTaskSerializer,
+    ArchivedFocusSessionSerializer,
+    ArchivedBlockSerializer,
 )
+from core.serializers.fast import TaskRowSerializer, FocusSessionRowSerializer, BlockRowSerializer
+
+
+MAX_WEEKS = 104
+MAX_MONTHS = 60
+MAX_OCCURRENCE_WINDOW = timedelta(days=366)
+
+
+def _bounded_int(request, name, default, maximum):
+    raw = request.query_params.get(name, default)
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        raise exceptions.ValidationError({name: "Must be an integer."})
+    if not 1 <= value <= maximum:
+        raise exceptions.ValidationError({name: f"Must be between 1 and {maximum}."})
+    return value
+
+
+DELETION_STATUS_SALT = "core.deletion-status"
+
+
+def deletion_accepted(request, job):
+    """202 pointing at the job's status endpoint.
+
+    An account job deactivates its user, who then can't authenticate, so
+    its status lives at a signed URL that needs no login.
+    """
+    if job.kind == DeletionJob.Kind.ACCOUNT:
+        url = reverse("deletion-status", args=[signing.dumps(job.pk, salt=DELETION_STATUS_SALT)])
+    else:
+        url = reverse("deletion-detail", args=[job.pk])
+    data = DeletionJobSerializer(job).data
+    data["status_url"] = request.build_absolute_uri(url)
+    return response.Response(data, status=status.HTTP_202_ACCEPTED, headers={"Location": url})
+
+
+def _datetime_param(request, name):
+    raw = request.query_params.get(name)
+    value = parse_datetime(raw) if raw else None
+    if value is None and raw:
+        day = parse_date(raw)
+        value = timezone.datetime.combine(day, timezone.datetime.min.time()) if day else None
+    if value is None:
+        raise exceptions.ValidationError({name: "Must be an ISO 8601 date or datetime."})
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _window(request):
+    start = _datetime_param(request, "start")
+    end = _datetime_param(request, "end")
+    if not start < end <= start + MAX_OCCURRENCE_WINDOW:
+        raise exceptions.ValidationError({"end": f"Must be after start and within {MAX_OCCURRENCE_WINDOW.days} days of it."})
+    return start, end
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+def _id_or_404(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise exceptions.NotFound()
+
+
+def _query_flag(request, name):
+    return request.query_params.get(name, "").lower() in ("1", "true", "yes")
+
+
+def _session_rollup(user, start_dt, end_dt, trunc):
+    """Per-period focus totals over live and archived sessions, ordered by period."""
+    totals = {}
+    for model in (FocusSession, ArchivedFocusSession):
+        qs = (
+            model.objects.filter(
+                task__user=user,
+                started_at__gte=start_dt,
+                started_at__lt=end_dt,
+            )
+            .annotate(period=trunc)
+            .values("period")
+            .annotate(
+                total_minutes=Sum("duration_minutes"),
+                session_count=Count("id"),
+                success_count=Sum(Case(When(success=True, then=1), default=0, output_field=IntegerField())),
+            )
+            .order_by("period")
+        )
+        for item in qs:
+            row = totals.setdefault(
+                item["period"],
+                {"period": item["period"], "total_minutes": 0, "session_count": 0, "success_count": 0},
+            )
+            row["total_minutes"] += item.get("total_minutes", 0) or 0
+            row["session_count"] += item.get("session_count", 0) or 0
+            row["success_count"] += item.get("success_count", 0) or 0
+    return [totals[period] for period in sorted(totals)]
+
+
+def weekly_rollup(user, weeks, start_str=None):
+    """Per-week focus totals for `weeks` weeks, ending this week unless `start_str` is given.
+
+    Weeks are the user's: Monday to Sunday in their time zone, each day
+    starting at their configured day start.
+    """
+    clock = Setting.day_clock(user.pk)
+
+    today = clock.today()
+    if start_str:
+        start_date = timezone.datetime.fromisoformat(start_str).date()
+    else:
+        start_date = today - timedelta(days=today.weekday())  # Monday of this week
+        start_date = start_date - timedelta(weeks=weeks - 1)
+
+    end_date = start_date + timedelta(weeks=weeks)
+    qs = _session_rollup(user, clock.start_of(start_date), clock.start_of(end_date), clock.trunc_week("started_at"))
+
+    data = [
+        {
+            "week_start": item["period"].date().isoformat(),
+            "week_end": (item["period"].date() + timedelta(days=6)).isoformat(),
+            "focused_minutes": item.get("total_minutes", 0) or 0,
+            "sessions": item.get("session_count", 0) or 0,
+            "successes": item.get("success_count", 0) or 0,
+        }
+        for item in qs
+    ]
+
+    return {
+        "start": start_date.isoformat(),
+        "end": (end_date - timedelta(days=1)).isoformat(),
+        "weeks": weeks,
+        "items": data,
+    }
+
+
+class ReplicaReadMixin:
+    """Route reads of safe requests to the read replica, see core.routers."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in permissions.SAFE_METHODS and replica_alias() and not is_pinned(request.user.pk, request):
+            self._replica_scope = open_scope()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_scope", None)
+        if token is not None:
+            close_scope(token)
+            self._replica_scope = None
+        elif request.method not in permissions.SAFE_METHODS and response.status_code < 400:
+            if request.user.is_authenticated:
+                pin_primary(request.user.pk, response)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class RowListMixin:
+    """Serve unpaginated GET lists through a core.serializers.fast row serializer."""
+    row_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if self.paginator is not None or not self.row_serializer_class.is_supported():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return response.Response(self.row_serializer_class(queryset, **self.get_row_serializer_kwargs()).data)
+
+    def get_row_serializer_kwargs(self):
+        return {}
+
+
+class TaskViewSet(ReplicaReadMixin, RowListMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = TaskSerializer
+    row_serializer_class = TaskRowSerializer
 
     def get_queryset(self):
         # Prefetch related focus sessions and blocks to reduce DB hits
-        return (
-            Task.objects.filter(user=self.request.user)
-            .prefetch_related("focus_sessions", "blocks")
-            .order_by("-created_at")
-        )
+        qs = Task.objects.filter(user=self.request.user).order_by("status", "position")
+        if self.action != "destroy":
+            # A task waiting on its DeletionJob is gone as far as clients are
+            # concerned; only a repeated DELETE still finds it (and its job).
+            qs = qs.exclude(pk__in=pending_targets(self.request.user.pk, DeletionJob.Kind.TASK))
+            qs = qs.prefetch_related("focus_sessions", "blocks")
+        status_filter = self.request.query_params.get("status")
+        if self.action == "list" and status_filter:
+            qs = qs.filter(status=status_filter)
+        return qs
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # `?omit_defaults=1`: clients that know the defaults skip the repeated colors.
+        context["omit_default_colors"] = _query_flag(self.request, "omit_defaults")
+        return context
+
+    def get_row_serializer_kwargs(self):
+        return {"omit_default_colors": _query_flag(self.request, "omit_defaults")}
+
+    def list(self, request, *args, **kwargs):
+        resp = super().list(request, *args, **kwargs)
+        if _query_flag(request, "include_archived"):
+            archived = (
+                ArchivedTask.objects.filter(user=request.user)
+                .prefetch_related("focus_sessions", "blocks")
+                .order_by("-created_at")
+            )
+            archived_data = ArchivedTaskSerializer(archived, many=True, context=self.get_serializer_context()).data
+            resp.data = list(resp.data) + list(archived_data)
+        return resp
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    def destroy(self, request, *args, **kwargs):
+        """Delete small tasks right away (204); hand big ones to a DeletionJob (202)."""
+        task = self.get_object()
+        rows = task.focus_sessions.count() + task.blocks.count()
+        if rows <= settings.DELETION_INLINE_LIMIT:
+            delete_tasks(request.user.pk, [task.pk])
+            return response.Response(status=status.HTTP_204_NO_CONTENT)
+        return deletion_accepted(request, enqueue(request.user.pk, DeletionJob.Kind.TASK, task.pk))
+
+    @decorators.action(detail=True, methods=["post"])
+    def move(self, request, pk=None):
+        """Put the task between two neighbours in a column, rewriting only its own row.
+
+        Body: optional `status` (the target column, default the current one)
+        and `after` / `before`, the ids of the tasks that end up directly
+        above / below it. Null means the top / bottom of the column; at least
+        one is required unless the column is otherwise empty.
+        """
+        task = self.get_object()
+        target = request.data.get("status", task.status)
+        if target not in Task.Status.values:
+            raise exceptions.ValidationError({"status": "Not a valid status."})
+
+        ids = {side: request.data.get(side) for side in ("after", "before")}
+        if ids["after"] is None and ids["before"] is None:
+            others = Task.objects.filter(user=request.user, status=target).exclude(pk=task.pk)
+            if others.exists():
+                raise exceptions.ValidationError({"detail": "Give after or before unless the column is empty."})
+
+        def neighbour_positions():
+            positions = {}
+            for side, raw in ids.items():
+                if raw is None:
+                    positions[side] = None
+                    continue
+                positions[side] = (
+                    Task.objects.filter(pk=_id_or_404(raw), user=request.user, status=target)
+                    .exclude(pk=task.pk)
+                    .values_list("position", flat=True)
+                    .first()
+                )
+                if positions[side] is None:
+                    raise exceptions.ValidationError({side: "Not a task in the target column."})
+            return positions
+
+        positions = neighbour_positions()
+        if positions["after"] is not None and positions["after"] == positions["before"] and ids["after"] != ids["before"]:
+            # Two tasks share a key; spread the column out so they can be told apart.
+            Task.rebalance(request.user.pk, target)
+            positions = neighbour_positions()
+        try:
+            key = key_between(positions["after"], positions["before"])
+            if len(key) > POSITION_MAX_LENGTH:
+                Task.rebalance(request.user.pk, target)
+                positions = neighbour_positions()
+                key = key_between(positions["after"], positions["before"])
+        except ValueError:
+            return response.Response({"detail": "after/before are not adjacent in that order; reload the column."}, status=409)
+
+        task.position = key
+        task.status = target
+        task.save(update_fields=["position", "status", "updated_at"])
+        return response.Response(self.get_serializer(task).data)
+
     @decorators.action(detail=True, methods=["post"], url_path="start-focus")
     def start_focus(self, request, pk=None):
-        task = self.get_object()
-        fs = FocusSession.objects.create(task=task, started_at=timezone.now())
+        task_id = _id_or_404(pk)
+        if pending_targets(request.user.pk, DeletionJob.Kind.TASK).filter(target_id=task_id).exists():
+            return response.Response({"detail": "Not found."}, status=404)
+        try:
+            with transaction.atomic():
+                fs = FocusSession.start(task_id, request.user.pk)
+        except IntegrityError:
+            fs = None
+        if fs is None:
+            if not Task.objects.filter(pk=task_id, user=request.user).exists():
+                return response.Response({"detail": "Not found."}, status=404)
+            return response.Response({"detail": "A focus session is already running"}, status=409)
         return response.Response(FocusSessionSerializer(fs).data, status=status.HTTP_201_CREATED)
 
     @decorators.action(detail=True, methods=["post"], url_path="end-focus")
     def end_focus(self, request, pk=None):
-        task = self.get_object()
-        fs_id = request.data.get("focus_session_id")
-        try:
-            fs = FocusSession.objects.get(id=fs_id, task=task)
-        except FocusSession.DoesNotExist:
+        fs = FocusSession.end(_id_or_404(request.data.get("focus_session_id")), _id_or_404(pk), request.user.pk)
+        if fs is None:
             return response.Response({"detail": "Focus session not found"}, status=404)
-        fs.ended_at = timezone.now()
-        fs.success = bool(request.data.get("success", True))
-        fs.save()
+        clock = Setting.day_clock(fs.user_id)
+        DaySummary.refresh(fs.user_id, clock.day_of(fs.started_at), clock)
         return response.Response(FocusSessionSerializer(fs).data)
 
     @decorators.action(detail=True, methods=["get"], url_path="stats")
@@ -61,98 +354,166 @@ class TaskViewSet(viewsets.ModelViewSet):
         })
 
 
-class FocusSessionViewSet(viewsets.ModelViewSet):
+class FocusSessionViewSet(ReplicaReadMixin, RowListMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = FocusSessionSerializer
+    row_serializer_class = FocusSessionRowSerializer
 
     def get_queryset(self):
         return FocusSession.objects.filter(task__user=self.request.user).order_by("-started_at")
 
+    def create(self, request, *args, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().create(request, *args, **kwargs)
+        except IntegrityError:
+            # focussession_one_open_per_user, same as start-focus.
+            return response.Response({"detail": "A focus session is already running"}, status=409)
+
+    def update(self, request, *args, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().update(request, *args, **kwargs)
+        except IntegrityError:
+            return response.Response({"detail": "A focus session is already running"}, status=409)
+
+    @decorators.action(detail=False, methods=["get"], url_path="active")
+    def active(self, request):
+        # Served by the partial index on (user) WHERE ended_at IS NULL.
+        fs = FocusSession.objects.filter(user=request.user, ended_at__isnull=True).first()
+        if fs is None:
+            return response.Response({"detail": "No active focus session"}, status=404)
+        return response.Response(FocusSessionSerializer(fs).data)
+
+    def list(self, request, *args, **kwargs):
+        resp = super().list(request, *args, **kwargs)
+        if _query_flag(request, "include_archived"):
+            archived = ArchivedFocusSession.objects.filter(task__user=request.user).order_by("-started_at")
+            resp.data = list(resp.data) + list(ArchivedFocusSessionSerializer(archived, many=True).data)
+        return resp
 
-class BlockViewSet(viewsets.ModelViewSet):
+
+class BlockViewSet(ReplicaReadMixin, RowListMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = BlockSerializer
+    row_serializer_class = BlockRowSerializer
 
     def get_queryset(self):
         return Block.objects.filter(task__user=self.request.user).order_by("-start_date")
 
+    def list(self, request, *args, **kwargs):
+        resp = super().list(request, *args, **kwargs)
+        if _query_flag(request, "include_archived"):
+            archived = ArchivedBlock.objects.filter(task__user=request.user).order_by("-start_date")
+            resp.data = list(resp.data) + list(ArchivedBlockSerializer(archived, many=True).data)
+        return resp
+
+    @decorators.action(detail=False, methods=["get"])
+    def occurrences(self, request):
+        """Blocks overlapping `?start=&end=`, with recurring ones expanded and their exceptions applied."""
+        start, end = _window(request)
+        blocks = list(
+            self.get_queryset()
+            .filter(start_date__lt=end)
+            .filter(~Q(recurrence="", end_date__lte=start))
+        )
+        longest = max((block.end_date - block.start_date for block in blocks), default=timedelta(0))
+        exceptions_by_block = {}
+        window_exceptions = BlockException.objects.filter(block__in=[b.pk for b in blocks if b.recurrence]).filter(
+            Q(occurrence_start__lt=end, occurrence_start__gte=start - longest)
+            | Q(start_date__lt=end, end_date__gt=start)
+        )
+        for exception in window_exceptions:
+            exceptions_by_block.setdefault(exception.block_id, []).append(exception)
+
+        tz = Setting.day_clock(request.user.pk).tz
+        occurrences = []
+        for block in blocks:
+            base = BlockSerializer(block).data
+            for occurrence in expand(block, start, end, exceptions_by_block.get(block.pk, ()), tz):
+                occurrences.append((occurrence, base))
+        occurrences.sort(key=lambda item: item[0]["start_date"])
+
+        stamp = serializers.DateTimeField()
+        data = [
+            {
+                **base,
+                "done": occurrence["done"],
+                "start_date": stamp.to_representation(occurrence["start_date"]),
+                "end_date": stamp.to_representation(occurrence["end_date"]),
+                "occurrence_start": stamp.to_representation(occurrence["occurrence_start"]),
+            }
+            for occurrence, base in occurrences
+        ]
+        return response.Response(data)
+
+    @decorators.action(detail=True, methods=["put", "delete"])
+    def override(self, request, pk=None):
+        """Create, replace (PUT) or drop (DELETE) the exception for one occurrence."""
+        block = self.get_object()
+        if request.method.lower() == "delete":
+            raw = request.data.get("occurrence_start") or request.query_params.get("occurrence_start")
+            occurrence_start = parse_datetime(raw or "")
+            if occurrence_start is None:
+                raise exceptions.ValidationError({"occurrence_start": "Must be an ISO 8601 datetime."})
+            block.exceptions.filter(occurrence_start=occurrence_start).delete()
+            return response.Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer = BlockExceptionSerializer(data=request.data, context={"block": block})
+        serializer.is_valid(raise_exception=True)
+        fields = {name: serializer.validated_data.get(name, default) for name, default in (
+            ("cancelled", False), ("done", False), ("start_date", None), ("end_date", None),
+        )}
+        exception, _ = BlockException.objects.update_or_create(
+            block=block,
+            occurrence_start=serializer.validated_data["occurrence_start"],
+            defaults=fields,
+        )
+        return response.Response(BlockExceptionSerializer(exception, context={"block": block}).data)
+
 
-class DaySummaryViewSet(viewsets.ModelViewSet):
+class DaySummaryViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = DaySummarySerializer
+    # Aggregations cost more than plain reads, see core.throttling.CostThrottle.
+    throttle_costs = {"recompute": 10, "weekly": 5, "monthly": 5}
 
     def get_queryset(self):
         return DaySummary.objects.filter(user=self.request.user).order_by("-date")
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        # (user, date) is unique: creating an existing day updates its text.
+        date = serializer.validated_data.get("date") or Setting.day_clock(self.request.user.pk).today()
+        DaySummary.objects.bulk_create(
+            [DaySummary(user=self.request.user, date=date, summary_text=serializer.validated_data.get("summary_text", ""))],
+            update_conflicts=True,
+            unique_fields=["user", "date"],
+            update_fields=["summary_text", "updated_at"],
+        )
+        bump_dashboard(self.request.user.pk, "day_summaries")
+        serializer.instance = DaySummary.objects.get(user=self.request.user, date=date)
 
     @decorators.action(detail=False, methods=["post"], url_path="recompute")
     def recompute(self, request):
         date_str = request.data.get("date")
-        date = timezone.datetime.fromisoformat(date_str).date() if date_str else timezone.localdate()
-        summary, _ = DaySummary.objects.get_or_create(user=request.user, date=date)
-        summary.recompute()
+        clock = Setting.day_clock(request.user.pk)
+        date = timezone.datetime.fromisoformat(date_str).date() if date_str else clock.today()
+        DaySummary.refresh(request.user.pk, date, clock)
+        summary = DaySummary.objects.get(user=request.user, date=date)
         return response.Response(DaySummarySerializer(summary).data)
 
     @decorators.action(detail=False, methods=["get"], url_path="weekly")
     def weekly(self, request):
-        tz = timezone.get_current_timezone()
-        weeks = int(request.query_params.get("weeks", 12))
-        start_str = request.query_params.get("start")
-
-        today = timezone.localdate()
-        if start_str:
-            start_date = timezone.datetime.fromisoformat(start_str).date()
-        else:
-            start_date = today - timedelta(days=today.weekday())  # Monday of this week
-            start_date = start_date - timedelta(weeks=weeks - 1)
-
-        end_date = start_date + timedelta(weeks=weeks)
-        start_dt = timezone.make_aware(timezone.datetime.combine(start_date, timezone.datetime.min.time()), tz)
-        end_dt = timezone.make_aware(timezone.datetime.combine(end_date, timezone.datetime.min.time()), tz)
-
-        qs = (
-            FocusSession.objects.filter(
-                task__user=request.user,
-                started_at__gte=start_dt,
-                started_at__lt=end_dt,
-            )
-            .annotate(period=TruncWeek("started_at", tzinfo=tz))
-            .values("period")
-            .annotate(
-                total_minutes=Sum("duration_minutes"),
-                session_count=Count("id"),
-                success_count=Sum(Case(When(success=True, then=1), default=0, output_field=IntegerField())),
-            )
-            .order_by("period")
-        )
-
-        data = [
-            {
-                "week_start": item["period"].date().isoformat(),
-                "week_end": (item["period"].date() + timedelta(days=6)).isoformat(),
-                "focused_minutes": item.get("total_minutes", 0) or 0,
-                "sessions": item.get("session_count", 0) or 0,
-                "successes": item.get("success_count", 0) or 0,
-            }
-            for item in qs
-        ]
-
-        return response.Response({
-            "start": start_date.isoformat(),
-            "end": (end_date - timedelta(days=1)).isoformat(),
-            "weeks": weeks,
-            "items": data,
-        })
+        weeks = _bounded_int(request, "weeks", 12, MAX_WEEKS)
+        return response.Response(weekly_rollup(request.user, weeks, request.query_params.get("start")))
 
     @decorators.action(detail=False, methods=["get"], url_path="monthly")
     def monthly(self, request):
-        tz = timezone.get_current_timezone()
-        months = int(request.query_params.get("months", 6))
+        clock = Setting.day_clock(request.user.pk)
+        months = _bounded_int(request, "months", 6, MAX_MONTHS)
         start_str = request.query_params.get("start")
 
-        today = timezone.localdate().replace(day=1)
+        today = clock.today().replace(day=1)
         if start_str:
             start_date = timezone.datetime.fromisoformat(start_str).date().replace(day=1)
         else:
@@ -172,24 +533,7 @@ class DaySummaryViewSet(viewsets.ModelViewSet):
             end_year += 1
         end_date = timezone.datetime(end_year, end_month, 1).date()
 
-        start_dt = timezone.make_aware(timezone.datetime.combine(start_date, timezone.datetime.min.time()), tz)
-        end_dt = timezone.make_aware(timezone.datetime.combine(end_date, timezone.datetime.min.time()), tz)
-
-        qs = (
-            FocusSession.objects.filter(
-                task__user=request.user,
-                started_at__gte=start_dt,
-                started_at__lt=end_dt,
-            )
-            .annotate(period=TruncMonth("started_at", tzinfo=tz))
-            .values("period")
-            .annotate(
-                total_minutes=Sum("duration_minutes"),
-                session_count=Count("id"),
-                success_count=Sum(Case(When(success=True, then=1), default=0, output_field=IntegerField())),
-            )
-            .order_by("period")
-        )
+        qs = _session_rollup(request.user, clock.start_of(start_date), clock.start_of(end_date), clock.trunc_month("started_at"))
 
         data = [
             {
@@ -209,7 +553,7 @@ class DaySummaryViewSet(viewsets.ModelViewSet):
         })
 
 
-class SettingViewSet(viewsets.ModelViewSet):
+class SettingViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = SettingSerializer
 
@@ -232,12 +576,52 @@ class SettingViewSet(viewsets.ModelViewSet):
         return response.Response(serializer.data)
 
 
-class NoteViewSet(viewsets.ModelViewSet):
+class NoteViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = NoteSerializer
 
     def get_queryset(self):
-        return Note.objects.filter(user=self.request.user).order_by("-updated_at")
+        qs = Note.objects.filter(user=self.request.user).order_by("-updated_at")
+        if self.action == "list":
+            return qs.defer("content")
+        if self.action in ("update", "partial_update"):
+            # Serialize edits so two content_patch requests can't both apply to one base.
+            return qs.select_for_update()
+        return qs
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return NoteListSerializer
+        return NoteSerializer
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+
+class DeletionJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Status of the user's task and account deletions."""
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = DeletionJobSerializer
+
+    def get_queryset(self):
+        return DeletionJob.objects.filter(user_id=self.request.user.pk).order_by("-created_at")
+
+
+class DeletionStatusView(APIView):
+    """Status of one job by the signed token from its 202; no login needed."""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, token):
+        try:
+            job_id = signing.loads(token, salt=DELETION_STATUS_SALT)
+        except signing.BadSignature:
+            raise exceptions.NotFound()
+        job = DeletionJob.objects.filter(pk=job_id).first()
+        if job is None:
+            raise exceptions.NotFound()
+        return response.Response(DeletionJobSerializer(job).data)
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import exceptions, permissions, response
+from rest_framework.views import APIView
+
+from core.deletion import pending_targets
+from core.models.main import Task, FocusSession, DaySummary, Block, Setting, Note, Tombstone, DeletionJob
+from core.serializers.fast import RowSerializer, TaskRowSerializer, FocusSessionRowSerializer, BlockRowSerializer
+from core.serializers.main import DaySummarySerializer, SettingSerializer, NoteSerializer
+
+# Rows committed slightly after a token was issued may carry an earlier
+# updated_at; re-sending a short window keeps them from being missed.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def encode_token(moment):
+    return str(int(moment.timestamp() * 1_000_000))
+
+
+def decode_token(token):
+    try:
+        return datetime.fromtimestamp(int(token) / 1_000_000, tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError):
+        raise exceptions.ValidationError({"since": "Invalid sync token."})
+
+
+class SyncView(APIView):
+    """Rows changed or deleted since `?since=<token>`, plus the next token.
+
+    Without a token, or with one older than the tombstone retention, the
+    response is a full snapshot (`"full": true`) and clients should replace
+    their local copy. Always reads the primary: replica lag longer than
+    SYNC_OVERLAP would drop changes from a delta.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_sections(self, user):
+        # Tasks waiting on a DeletionJob are already gone for clients.
+        pending = pending_targets(user.pk, DeletionJob.Kind.TASK)
+        return {
+            "tasks": (Task.objects.filter(user=user).exclude(pk__in=pending), TaskRowSerializer),
+            "focus_sessions": (
+                FocusSession.objects.filter(task__user=user).exclude(task__in=pending), FocusSessionRowSerializer,
+            ),
+            "blocks": (Block.objects.filter(task__user=user).exclude(task__in=pending), BlockRowSerializer),
+            "notes": (Note.objects.filter(user=user), NoteSerializer),
+            "settings": (Setting.objects.filter(user=user), SettingSerializer),
+            "day_summaries": (DaySummary.objects.filter(user=user), DaySummarySerializer),
+        }
+
+    def get(self, request):
+        now = timezone.now()
+        token = request.query_params.get("since")
+        since = decode_token(token) if token else None
+        retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        full = since is None or since < now - retention
+
+        changes = {}
+        deleted = {}
+        for name, (queryset, serializer_class) in self.get_sections(request.user).items():
+            if not full:
+                queryset = queryset.filter(updated_at__gte=since - SYNC_OVERLAP)
+            queryset = queryset.order_by("id")
+            if issubclass(serializer_class, RowSerializer):
+                changes[name] = serializer_class(queryset).data
+            else:
+                changes[name] = serializer_class(queryset, many=True).data
+            deleted[name] = []
+
+        if not full:
+            tombstones = Tombstone.objects.filter(
+                user=request.user,
+                deleted_at__gte=since - SYNC_OVERLAP,
+            ).values_list("model", "object_id")
+            for name, object_id in tombstones:
+                deleted.setdefault(name, []).append(object_id)
+            # Their tombstones only come once the job has run; report them now.
+            pending = pending_targets(request.user.pk, DeletionJob.Kind.TASK)
+            deleted["tasks"].extend(pending.values_list("target_id", flat=True))
+
+        return response.Response({
+            "token": encode_token(now),
+            "full": full,
+            "changes": changes,
+            "deleted": deleted,
+        })
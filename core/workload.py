@@ -0,0 +1,343 @@
+"""Synthetic users and traffic for tuning the service.
+
+`seed` creates load-test users with tasks, focus history, day summaries
+and notes. Their sizes come from Distribution specs. `synthetic_events`
+draws a request mix as (username, action) pairs, and `Replayer` sends such
+a mix to the API in-process at a target rate.
+
+Events name actions, not concrete requests. Ids such as the open session
+or the task being moved are resolved from each user's state during the
+replay, so a recorded mix can be replayed against any database seeded
+with the same user prefix.
+"""
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.dayclock import DayClock
+from core.models.main import Task, FocusSession, DaySummary, Setting, Note
+from core.ordering import spaced_keys
+
+DEFAULT_MIX = {
+    "dashboard": 25,
+    "task_list": 20,
+    "start_focus": 10,
+    "end_focus": 10,
+    "move_task": 10,
+    "note_edit": 10,
+    "weekly": 10,
+    "create_task": 5,
+}
+
+
+class Distribution:
+    """A non-negative integer distribution written as `kind:params`.
+
+    `const:N`, `uniform:LOW-HIGH` (inclusive), `poisson:MEAN` or
+    `lognormal:MEDIAN,SIGMA`. A bare number means `const`.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        if not params:
+            kind, params = "const", kind
+        try:
+            if kind == "const":
+                self.args = (int(params),)
+            elif kind == "uniform":
+                low, high = (int(value) for value in params.split("-"))
+                self.args = (low, high) if low <= high else (high, low)
+            elif kind == "poisson":
+                self.args = (float(params),)
+            elif kind == "lognormal":
+                median, sigma = (float(value) for value in params.split(","))
+                self.args = (median, sigma)
+            else:
+                raise ValueError(f"Unknown distribution {kind!r}")
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid distribution {spec!r}: {exc}") from None
+        if min(self.args) < 0:
+            raise ValueError(f"Invalid distribution {spec!r}: negative parameter")
+        self.kind = kind
+
+    def sample(self, rng):
+        if self.kind == "const":
+            return self.args[0]
+        if self.kind == "uniform":
+            return rng.randint(*self.args)
+        if self.kind == "poisson":
+            mean = self.args[0]
+            if mean >= 30:
+                return max(0, round(rng.gauss(mean, math.sqrt(mean))))
+            # Knuth's method; fine for small means.
+            limit, count, product = math.exp(-mean), 0, rng.random()
+            while product > limit:
+                count += 1
+                product *= rng.random()
+            return count
+        median, sigma = self.args
+        return max(0, round(median * math.exp(rng.gauss(0, sigma))))
+
+    def __repr__(self):
+        return f"Distribution({self.spec!r})"
+
+
+def seed(prefix, users, tasks_per_user, sessions_per_day, session_minutes, notes_per_user, note_size, days, rng):
+    """Create `users` users named `<prefix>-<n>` with their data; returns the usernames.
+
+    Everything is bulk inserted. Day summaries are computed from the
+    generated sessions instead of one refresh per session.
+    """
+    User = get_user_model()
+    clock = DayClock()
+    now = timezone.now()
+    unusable = make_password(None)
+    start = User.objects.filter(username__startswith=f"{prefix}-").count()
+    names = [f"{prefix}-{n}" for n in range(start, start + users)]
+
+    with transaction.atomic():
+        created = User.objects.bulk_create([User(username=name, password=unusable) for name in names])
+        Setting.objects.bulk_create([Setting(user=user) for user in created])
+        for user in created:
+            count = max(1, tasks_per_user.sample(rng))
+            statuses = [rng.choice(Task.Status.values) for _ in range(count)]
+            positions = {status: iter(spaced_keys(statuses.count(status))) for status in set(statuses)}
+            tasks = Task.objects.bulk_create([
+                Task(user=user, title=f"Task {n}", status=status, position=next(positions[status]))
+                for n, status in enumerate(statuses)
+            ])
+
+            sessions = []
+            totals = defaultdict(int)
+            for day in range(days, 0, -1):
+                day_start = clock.start_of(clock.day_of(now - timedelta(days=day)))
+                for _ in range(sessions_per_day.sample(rng)):
+                    started = day_start + timedelta(minutes=rng.randrange(8 * 60, 22 * 60))
+                    minutes = max(1, session_minutes.sample(rng))
+                    sessions.append(FocusSession(
+                        task=rng.choice(tasks),
+                        user=user,
+                        started_at=started,
+                        ended_at=started + timedelta(minutes=minutes),
+                    ))
+                    totals[clock.day_of(started)] += minutes
+            FocusSession.objects.bulk_create(sessions, batch_size=1000)
+            DaySummary.objects.bulk_create(
+                [DaySummary(user=user, date=date, total_focused_minutes=minutes) for date, minutes in totals.items()],
+                batch_size=1000,
+            )
+
+            notes = []
+            for n in range(notes_per_user.sample(rng)):
+                note = Note(user=user, title=f"Note {n}", content="lorem ipsum " * (note_size.sample(rng) // 12))
+                note.refresh_content_fields()
+                notes.append(note)
+            Note.objects.bulk_create(notes)
+    return names
+
+
+def synthetic_events(usernames, count, mix, rng):
+    """`count` (username, action) pairs drawn with the weights in `mix`."""
+    actions = list(mix)
+    weights = [mix[action] for action in actions]
+    return [(rng.choice(usernames), action) for action in rng.choices(actions, weights, k=count)]
+
+
+def parse_mix(spec):
+    """`dashboard=25,task_list=20,...` -> {action: weight}."""
+    mix = {}
+    for part in filter(None, (item.strip() for item in spec.split(","))):
+        action, _, weight = part.partition("=")
+        if action not in DEFAULT_MIX:
+            raise ValueError(f"Unknown action {action!r}; choose from {', '.join(DEFAULT_MIX)}")
+        mix[action] = float(weight or 1)
+    return mix
+
+
+def save_events(path, events):
+    with open(path, "w") as handle:
+        for username, action in events:
+            handle.write(json.dumps({"user": username, "action": action}) + "\n")
+
+
+def load_events(path):
+    with open(path) as handle:
+        return [(row["user"], row["action"]) for row in map(json.loads, filter(str.strip, handle))]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    return sorted_values[max(0, math.ceil(len(sorted_values) * fraction) - 1)]
+
+
+class LoadUser:
+    """One user's client plus the ids the next requests need."""
+
+    def __init__(self, user, rng):
+        self.rng = rng
+        self.user_id = user.pk
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.task_ids = list(Task.objects.filter(user=user).values_list("pk", flat=True))
+        self.open_session = (
+            FocusSession.objects.filter(user=user, ended_at__isnull=True).values_list("pk", flat=True).first()
+        )
+        self.notes = {
+            note["pk"]: note
+            for note in Note.objects.filter(user=user).values("pk", "content_hash", "content_size")
+        }
+
+    def request(self, action):
+        """(method, path, body) for `action`, adjusted to what this user can do now."""
+        if action in ("start_focus", "end_focus") and self.task_ids:
+            # Pair starts and ends up: a user has at most one open session.
+            if self.open_session is None:
+                return "post", f"/api/tasks/{self.rng.choice(self.task_ids)}/start-focus/", None
+            task_id = FocusSession.objects.filter(pk=self.open_session).values_list("task_id", flat=True).first()
+            return "post", f"/api/tasks/{task_id}/end-focus/", {"focus_session_id": self.open_session}
+        if action == "move_task" and self.task_ids:
+            # Drop it on top of a random column, above that column's first task.
+            task_id = self.rng.choice(self.task_ids)
+            status = self.rng.choice(Task.Status.values)
+            first = (
+                Task.objects.filter(user_id=self.user_id, status=status).exclude(pk=task_id)
+                .order_by("position").values_list("pk", flat=True).first()
+            )
+            return "post", f"/api/tasks/{task_id}/move/", {"status": status, "after": None, "before": first}
+        if action == "note_edit" and self.notes:
+            note = self.notes[self.rng.choice(list(self.notes))]
+            body = {
+                "content_patch": [{"offset": note["content_size"], "insert": " edit"}],
+                "base_hash": note["content_hash"],
+            }
+            return "patch", f"/api/notes/{note['pk']}/", body
+        if action == "create_task":
+            return "post", "/api/tasks/", {"title": "Synthetic task"}
+        if action == "weekly":
+            return "get", "/api/day-summaries/weekly/", None
+        if action == "dashboard":
+            return "get", "/api/dashboard/", None
+        return "get", "/api/tasks/", None
+
+    def observe(self, method, path, resp):
+        if resp.status_code >= 400:
+            if resp.status_code == 409 and path.endswith("/start-focus/"):
+                # Someone else opened a session; pick it up.
+                self.open_session = (
+                    FocusSession.objects.filter(user_id=self.user_id, ended_at__isnull=True)
+                    .values_list("pk", flat=True).first()
+                )
+            return
+        if path.endswith("/start-focus/"):
+            self.open_session = resp.json()["id"]
+        elif path.endswith("/end-focus/"):
+            self.open_session = None
+        elif path == "/api/tasks/" and method == "post":
+            self.task_ids.append(resp.json()["id"])
+        elif path.startswith("/api/notes/"):
+            data = resp.json()
+            self.notes[data["id"]].update(content_hash=data["content_hash"], content_size=data["content_size"])
+
+
+def route_label(method, path):
+    match = resolve(path)
+    return f"{method.upper()} {match.url_name or match.route}"
+
+
+class Replayer:
+    """Send events to the API at `rate` requests/second (0: as fast as possible).
+
+    Users are split between `workers` threads so each user's requests stay
+    in order. Latency is measured from the moment a request was due, so a
+    server that falls behind the schedule shows up in the percentiles
+    instead of silently lowering the rate.
+    """
+
+    def __init__(self, rate=0, workers=1, seed=0):
+        self.rate = rate
+        self.workers = max(1, workers)
+        self.seed = seed
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def run(self, events):
+        User = get_user_model()
+        users = {user.username: user for user in User.objects.filter(username__in={name for name, _ in events})}
+        missing = {name for name, _ in events} - set(users)
+        if missing:
+            raise ValueError(f"Unknown users in the mix: {', '.join(sorted(missing)[:5])}")
+
+        shards = defaultdict(list)
+        order = {name: n for n, name in enumerate(sorted(users))}
+        for index, (name, action) in enumerate(events):
+            shards[order[name] % self.workers].append((index, name, action))
+
+        started = time.perf_counter()
+        if self.workers == 1:
+            self._work(shards[0], users, started, close=False)
+        else:
+            threads = [
+                threading.Thread(target=self._work, args=(shard, users, started))
+                for shard in shards.values()
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return self.report(time.perf_counter() - started)
+
+    def _work(self, shard, users, started, close=True):
+        rng = random.Random(self.seed)
+        states = {}
+        try:
+            for index, name, action in shard:
+                state = states.get(name) or states.setdefault(name, LoadUser(users[name], rng))
+                method, path, body = state.request(action)
+                due = started + index / self.rate if self.rate else time.perf_counter()
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                resp = getattr(state.client, method)(path, body, format="json")
+                elapsed = time.perf_counter() - due
+                state.observe(method, path, resp)
+                label = route_label(method, path)
+                with self._lock:
+                    self.samples[label].append(elapsed)
+                    if resp.status_code >= 400:
+                        self.errors[label] += 1
+        finally:
+            if close:
+                connection.close()
+
+    def report(self, elapsed):
+        routes = {}
+        for label, samples in sorted(self.samples.items()):
+            samples.sort()
+            routes[label] = {
+                "requests": len(samples),
+                "errors": self.errors[label],
+                "p50_ms": percentile(samples, 0.50) * 1000,
+                "p95_ms": percentile(samples, 0.95) * 1000,
+                "p99_ms": percentile(samples, 0.99) * 1000,
+                "max_ms": samples[-1] * 1000,
+            }
+        total = sum(route["requests"] for route in routes.values())
+        return {
+            "requests": total,
+            "seconds": elapsed,
+            "throughput": total / elapsed if elapsed else 0.0,
+            "routes": routes,
+        }
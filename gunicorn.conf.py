@@ -0,0 +1,21 @@
+"""Gunicorn settings, picked up automatically from the working directory.
+
+The app is imported once in the master (`preload_app`) and workers are
+forked from it, so Django, DRF and the URLconf are loaded a single time and
+their memory is shared copy-on-write. Don't open database connections at
+import time: they would be shared across forks too.
+"""
+import gc
+import os
+
+wsgi_app = "config.wsgi:application"
+preload_app = True
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+
+
+def when_ready(server):
+    # Keep the collector from touching objects created during preload;
+    # walking them writes to their pages and un-shares them in each worker.
+    gc.freeze()